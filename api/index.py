@@ -21,10 +21,15 @@ except Exception as e:
     print(f"❌ Error importing FastAPI app: {e}")
     raise
 
-# Initialize database tables (but don't fail if seed data errors)
+# Start from the precompiled snapshot (backend/snapshot.py) so a cold start
+# serves data without parsing MM_Data.xlsx, then initialize database tables
+# (but don't fail if seed data errors)
 try:
-    from database import Base, engine
-    Base.metadata.create_all(bind=engine)
+    from database import DB_PATH, init_db
+    from snapshot import restore_snapshot
+    if restore_snapshot(DB_PATH):
+        print("✅ Database restored from snapshot")
+    init_db()
     print("✅ Database tables created")
 except Exception as e:
     print(f"⚠️ Database initialization warning: {e}")
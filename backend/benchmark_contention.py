@@ -0,0 +1,178 @@
+"""
+Contention benchmark for the SQLite connection profile in database.py.
+
+Simulates assessors saving checksheets while browsers poll the areas
+endpoint. Writer processes repeatedly save a batch of checksheet
+selections in one transaction, one row at a time the way
+/api/mm/checksheet-selections once did. Reader processes repeatedly load
+every area with its dimensions, as /api/mm/areas does. The run is repeated
+on a fresh copy of the database for each profile:
+
+    legacy   the old engine: rollback journal, default pool, no pragmas
+    tuned    the current profile: WAL, busy timeout, tuned pragmas, and
+             separate read and write pools
+
+For each profile it reports read latency percentiles, throughput and the
+number of failed transactions: "database is locked", or two writers
+inserting the same selection at once.
+
+Usage (from the backend directory):
+    python benchmark_contention.py [--seconds 10] [--readers 8] [--writers 3] [--batch 300]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import DB_PATH, SQLITE_PRAGMAS, Area, ChecksheetSelection, create_sqlite_engine, init_db
+
+
+def legacy_engines(url):
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    return engine, engine
+
+
+def tuned_engines(url):
+    return create_sqlite_engine(url), create_sqlite_engine(url, read_only=True)
+
+
+def save_selections(session_factory, batch):
+    """One checksheet save: look up each selection, then insert or update it"""
+    db = session_factory()
+    try:
+        assessment_id = random.randint(1, 20)
+        for maturity_level_id in range(1, batch + 1):
+            existing = db.query(ChecksheetSelection).filter(
+                ChecksheetSelection.assessment_id == assessment_id,
+                ChecksheetSelection.maturity_level_id == maturity_level_id
+            ).first()
+            if existing:
+                existing.is_selected = not existing.is_selected
+            else:
+                db.add(ChecksheetSelection(
+                    assessment_id=assessment_id, maturity_level_id=maturity_level_id, is_selected=True
+                ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def load_areas(session_factory):
+    db = session_factory()
+    try:
+        return sum(len(area.dimensions) for area in db.query(Area).all())
+    finally:
+        db.close()
+
+
+PROFILES = {"legacy": legacy_engines, "tuned": tuned_engines}
+
+
+def worker(role, profile, url, seconds, batch, results):
+    """Run one reader or writer process for ``seconds`` and report its counts"""
+    write_engine, read_engine = PROFILES[profile](url)
+    session_factory = sessionmaker(bind=read_engine if role == "reader" else write_engine)
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == "reader":
+                load_areas(session_factory)
+            else:
+                save_selections(session_factory, batch)
+        except (OperationalError, IntegrityError):
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+
+    write_engine.dispose()
+    read_engine.dispose()
+    results.put((role, latencies, errors))
+
+
+def run_profile(name, source_db, args):
+    scratch = tempfile.mkdtemp()
+    path = os.path.join(scratch, "contention.db")
+    shutil.copyfile(source_db, path)
+    url = f"sqlite:///{path}"
+
+    # Bring the copy up to date and into the profile's journal mode
+    write_engine, read_engine = PROFILES[name](url)
+    init_db(write_engine)
+    write_engine.dispose()
+    read_engine.dispose()
+
+    # Separate processes, like several uvicorn workers sharing one database file
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(role, name, url, args.seconds, args.batch, results))
+        for role in ["reader"] * args.readers + ["writer"] * args.writers
+    ]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    shutil.rmtree(scratch)
+
+    read_latencies = sorted(l for role, latencies, _ in outcomes if role == "reader" for l in latencies) or [0.0]
+    writes = sum(len(latencies) for role, latencies, _ in outcomes if role == "writer")
+
+    def percentile(p):
+        return read_latencies[min(len(read_latencies) - 1, int(len(read_latencies) * p))] * 1000
+
+    return {
+        "profile": name,
+        "reads_per_second": len(read_latencies) / args.seconds,
+        "writes_per_second": writes / args.seconds,
+        "p50": statistics.median(read_latencies) * 1000,
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": read_latencies[-1] * 1000,
+        "read_errors": sum(errors for role, _, errors in outcomes if role == "reader"),
+        "write_errors": sum(errors for role, _, errors in outcomes if role == "writer"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10, help="Duration of each profile's run")
+    parser.add_argument("--readers", type=int, default=8, help="Processes polling the areas query")
+    parser.add_argument("--writers", type=int, default=3, help="Processes saving checksheet selections")
+    parser.add_argument("--batch", type=int, default=300, help="Selections per checksheet save")
+    parser.add_argument("--database", default=DB_PATH, help="Database to copy for each run")
+    args = parser.parse_args()
+
+    print(f"Tuned profile: {', '.join(f'{k}={v}' for k, v in SQLITE_PRAGMAS.items())}")
+    print(f"{args.readers} readers, {args.writers} writers x {args.batch} selections, {args.seconds:g}s per profile\n")
+
+    results = [
+        run_profile("legacy", args.database, args),
+        run_profile("tuned", args.database, args),
+    ]
+
+    print(f"{'profile':<10}{'reads/s':>10}{'writes/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'read err':>10}{'write err':>11}")
+    for r in results:
+        print(f"{r['profile']:<10}{r['reads_per_second']:>10.1f}{r['writes_per_second']:>10.1f}{r['p50']:>9.1f}"
+              f"{r['p95']:>9.1f}{r['p99']:>9.1f}{r['max']:>9.1f}{r['read_errors']:>10}{r['write_errors']:>11}")
+
+
+if __name__ == "__main__":
+    main()
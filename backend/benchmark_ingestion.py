@@ -0,0 +1,131 @@
+"""
+Throughput benchmark for the sheet specs in ingestion.py.
+
+Each spec's sheet is read from the workbook once and its data rows are
+repeated ``--scale`` times, with the key column suffixed per copy so the
+copies do not collapse into one another. The scaled sheet then goes through
+every stage of the pipeline, with the writes going to a scratch SQLite
+database:
+
+    parse     frame parser over the scaled sheet
+    validate  the spec's record checks
+    stream    row parser + validation over the same rows as tuples
+    insert    first write into empty tables
+    resync    second write of the same records (nothing changes)
+
+Fixed-grid sheets such as Rating Scales cannot be scaled by adding rows, so
+they are parsed ``--scale`` times instead.
+
+Usage (from the backend directory):
+    python benchmark_ingestion.py [--scale 200] [--workbook path/to/MM_Data.xlsx]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from ingestion import EXCEL_PATH, SHEET_SPECS, read_workbook_sheets
+
+# Column role made unique per copy when a sheet is scaled
+KEY_COLUMNS = {
+    "Reports": "area",
+    "Smart Factory CheckSheet": "sub_level",
+}
+
+
+def scale_frame(frame, spec, scale):
+    """The sheet with its data rows repeated ``scale`` times"""
+    header = frame.iloc[:spec.header_rows]
+    body = frame.iloc[spec.header_rows:]
+    key_col = spec.columns[KEY_COLUMNS[spec.sheet_name]]
+
+    copies = []
+    for copy in range(scale):
+        rows = body.copy()
+        if copy:
+            keys = rows[key_col]
+            rows[key_col] = keys.where(keys.isna(), keys.astype(str) + f"-{copy}")
+        copies.append(rows)
+    return pd.concat([header] + copies, ignore_index=True)
+
+
+def frame_rows(frame):
+    """Sheet rows as tuples with missing cells as None, like iter_sheet_rows"""
+    return [
+        tuple(None if pd.isna(value) else value for value in row)
+        for row in frame.itertuples(index=False, name=None)
+    ]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - started
+
+
+def benchmark_spec(spec, frame, scale, session_factory):
+    fixed_grid = spec.sheet_name not in KEY_COLUMNS
+    if fixed_grid:
+        frames = [frame] * scale
+        sheet_rows = len(frame) * scale
+    else:
+        frames = [scale_frame(frame, spec, scale)]
+        sheet_rows = len(frames[0]) - spec.header_rows
+
+    parsed, parse_seconds = timed(lambda: [spec.parse_frame(f) for f in frames])
+    validated, validate_seconds = timed(lambda: [list(spec.validate(records)) for records in parsed])
+    rows = [frame_rows(f) for f in frames]
+    _, stream_seconds = timed(lambda: [list(spec.validate(spec.parse_rows(iter(r)))) for r in rows])
+
+    records = validated[0]
+    db = session_factory()
+    try:
+        inserted = spec.write(db, records)
+        resynced = spec.write(db, records)
+    finally:
+        db.close()
+
+    return {
+        "sheet": spec.sheet_name,
+        "sheet_rows": sheet_rows,
+        "records": sum(len(r) for r in validated),
+        "parse": sheet_rows / parse_seconds,
+        "validate": sheet_rows / validate_seconds if validate_seconds else float("inf"),
+        "stream": sheet_rows / stream_seconds,
+        "insert": inserted["rows_per_second"],
+        "resync": resynced["rows_per_second"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=200, help="Copies of each sheet's data rows")
+    parser.add_argument("--workbook", default=EXCEL_PATH, help="Workbook to read the sheets from")
+    args = parser.parse_args()
+
+    frames = read_workbook_sheets(args.workbook, list(SHEET_SPECS))
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(f"sqlite:///{os.path.join(scratch, 'benchmark.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        results = [
+            benchmark_spec(spec, frames[sheet_name], args.scale, session_factory)
+            for sheet_name, spec in SHEET_SPECS.items()
+        ]
+        engine.dispose()
+
+    print(f"Scale x{args.scale}; parse/validate/stream in sheet rows/s, insert/resync in records/s")
+    print(f"{'sheet':<26}{'rows':>9}{'records':>9}{'parse':>11}{'validate':>11}{'stream':>11}{'insert':>11}{'resync':>11}")
+    for r in results:
+        print(f"{r['sheet']:<26}{r['sheet_rows']:>9}{r['records']:>9}{r['parse']:>11,.0f}{r['validate']:>11,.0f}"
+              f"{r['stream']:>11,.0f}{r['insert']:>11,}{r['resync']:>11,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import create_engine, event, inspect, Column, Integer, SmallInteger, String, Float, DateTime, ForeignKey, Text, Boolean, Index, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import Session, sessionmaker, relationship
+from sqlalchemy.pool import QueuePool
+from contextlib import contextmanager
 from datetime import datetime
 import os
-from pathlib import Path
+import warnings
 
 # For serverless, use /tmp directory for SQLite database
 if os.environ.get('VERCEL'):
@@ -15,10 +17,54 @@ else:
 
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# SQLite settings applied to every new connection. WAL lets readers carry on
+# while a refresh or checksheet save is writing. Each one can be overridden
+# with MM_SQLITE_<NAME>, e.g. MM_SQLITE_BUSY_TIMEOUT=10000
+SQLITE_PRAGMAS = {
+    name: os.environ.get(f"MM_SQLITE_{name.upper()}", default)
+    for name, default in [
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),  # Safe with WAL; only the last commits can be lost on power failure
+        ("busy_timeout", "5000"),  # Milliseconds to wait for a lock before "database is locked"
+        ("cache_size", "-20000"),  # Negative means KiB, so 20 MB per connection
+        ("mmap_size", "268435456"),  # 256 MB
+        ("temp_store", "MEMORY"),
+    ]
+}
+
+# Writes and reads use separate pools so a burst of polling cannot starve the
+# writers of connections; read connections are query_only
+WRITE_POOL_SIZE = int(os.environ.get('MM_DB_WRITE_POOL_SIZE', '5'))
+READ_POOL_SIZE = int(os.environ.get('MM_DB_READ_POOL_SIZE', '10'))
+POOL_MAX_OVERFLOW = int(os.environ.get('MM_DB_POOL_MAX_OVERFLOW', '10'))
+POOL_TIMEOUT = float(os.environ.get('MM_DB_POOL_TIMEOUT', '30'))
+
+def create_sqlite_engine(url=SQLALCHEMY_DATABASE_URL, read_only=False):
+    """Engine with the connection profile above applied on connect"""
+    sqlite_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=READ_POOL_SIZE if read_only else WRITE_POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT
+    )
+    
+    @event.listens_for(sqlite_engine, "connect")
+    def apply_profile(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    
+    return sqlite_engine
+
+engine = create_sqlite_engine()
+read_engine = create_sqlite_engine(read_only=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -26,20 +72,28 @@ class Area(Base):
     __tablename__ = "areas"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, unique=True, index=True)
+    name = Column(String, index=True)
+    plant_name = Column(String, nullable=True)  # None for areas loaded from MM_Data.xlsx
     description = Column(Text, nullable=True)
     desired_level = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     dimensions = relationship("Dimension", back_populates="area")
     assessments = relationship("Assessment", back_populates="area")
+    
+    # Area names are unique per plant. NULLs are distinct in a unique index,
+    # so MM_Data.xlsx areas (plant_name NULL) need their own partial index.
+    __table_args__ = (
+        Index("ix_areas_plant_name_name", "plant_name", "name", unique=True),
+        Index("ix_areas_default_plant_name", "name", unique=True, sqlite_where=text("plant_name IS NULL")),
+    )
 
 class Dimension(Base):
     __tablename__ = "dimensions"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
-    area_id = Column(Integer, ForeignKey("areas.id"))
+    area_id = Column(Integer, ForeignKey("areas.id"), index=True)
     current_level = Column(Integer, default=1)
     desired_level = Column(Integer, default=3)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -62,12 +116,15 @@ class RatingScale(Base):
     __tablename__ = "rating_scales"
     
     id = Column(Integer, primary_key=True, index=True)
-    dimension_name = Column(String, index=True)
+    dimension_name = Column(String)
     level = Column(Integer)
     rating_name = Column(String)  # e.g., "1 – Basic Connectivity"
     digital_maturity_description = Column(Text)
     business_relevance = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Scales are looked up by dimension and listed in level order
+    __table_args__ = (Index("ix_rating_scales_dimension_name_level", "dimension_name", "level"),)
 
 class Assessment(Base):
     __tablename__ = "assessments"
@@ -78,6 +135,8 @@ class Assessment(Base):
     assessment_date = Column(DateTime, default=datetime.utcnow)
     assessor_name = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
+    # Bumped by every write to the assessment's checksheet selections
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     
     area = relationship("Area", back_populates="assessments")
     dimension_assessments = relationship("DimensionAssessment", back_populates="assessment")
@@ -107,12 +166,246 @@ class ChecksheetSelection(Base):
     evidence = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Assessment version that last changed this selection
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     
     maturity_level = relationship("MaturityLevel")
+    
+    # One selection per item per assessment; checksheet saves look rows up by this pair
+    __table_args__ = (
+        Index("ix_checksheet_selections_assessment_id_maturity_level_id",
+              "assessment_id", "maturity_level_id", unique=True),
+    )
+
+class SheetFingerprint(Base):
+    __tablename__ = "sheet_fingerprints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    sheet_name = Column(String, unique=True, index=True)
+    sha256 = Column(String)  # Hash of the sheet XML plus the shared strings it references
+    file_mtime = Column(Float)
+    file_size = Column(Integer)
+    result = Column(Text)  # JSON of the counts returned by the last load
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class PlantWorkbook(Base):
+    __tablename__ = "plant_workbooks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    plant_name = Column(String, index=True)
+    filename = Column(String)  # Name the file was uploaded as
+    path = Column(String)  # Where the upload is stored; cleared once a newer upload replaces it
+    sha256 = Column(String)
+    file_size = Column(Integer)
+    result = Column(Text)  # JSON of the counts returned by the load
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+
+class MatrixDocument(Base):
+    __tablename__ = "matrix_documents"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String)  # Hash of content, used as the cache version
+    content = Column(Text)  # Serialized JSON served by /api/mm/matrices
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DimensionLevelHistory(Base):
+    """Append-only log of dimension level changes; see history.py.
+
+    Rows are never updated or deleted and carry no foreign keys, so the
+    history of a dimension outlives the dimension itself.
+    """
+    __tablename__ = "dimension_level_history"
+    
+    id = Column(Integer, primary_key=True)
+    dimension_id = Column(Integer, nullable=False)
+    area_id = Column(Integer, nullable=False)  # Copied from the dimension for per-area range queries
+    current_level = Column(SmallInteger, nullable=False)
+    desired_level = Column(SmallInteger, nullable=True)
+    source = Column(SmallInteger, nullable=False)  # Which write path recorded it; history.SOURCE_*
+    ts = Column(Integer, nullable=False)  # Unix epoch seconds
+    
+    __table_args__ = (
+        Index("ix_dimension_level_history_dimension_id_ts", "dimension_id", "ts"),
+        Index("ix_dimension_level_history_area_id_ts", "area_id", "ts"),
+    )
+
+class DimensionLevelRollup(Base):
+    """Hourly and daily aggregates of dimension_level_history, kept by history.py.
+
+    A row exists for each bucket in which a dimension's level changed. Its
+    level-seconds integral from first_ts to last_ts, carried on at close_level
+    to the end of the bucket, gives the bucket's time-weighted average level.
+    """
+    __tablename__ = "dimension_level_rollups"
+    
+    resolution = Column(Integer, primary_key=True)  # Bucket width in seconds
+    dimension_id = Column(Integer, primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # Bucket start, epoch seconds
+    first_ts = Column(Integer, nullable=False)  # Bucket start, or the first level change if none came before
+    area_id = Column(Integer, nullable=False)
+    close_level = Column(SmallInteger, nullable=False)  # Level after the bucket's last change
+    level_seconds = Column(Integer, nullable=False)  # Sum of level x seconds from bucket start to last_ts
+    last_ts = Column(Integer, nullable=False)
+    changes = Column(Integer, nullable=False)
+    
+    __table_args__ = (Index("ix_dimension_level_rollups_resolution_area_id_bucket", "resolution", "area_id", "bucket"),)
+
+class DataVersion(Base):
+    """Change counter per group of tables, bumped by triggers (see migrate_db)"""
+    __tablename__ = "data_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(Integer, nullable=False)  # Unix epoch seconds of the last change
+
+class RowChange(Base):
+    """Latest change to each area and dimension, kept by triggers (see migrate_db).
+
+    Every insert, update or delete replaces the row's entry with one under a
+    new seq, so seq orders rows by when they last changed and serves as the
+    cursor of /api/mm/areas/changes. Deleted rows stay as tombstones.
+    """
+    __tablename__ = "row_changes"
+    
+    seq = Column(Integer, primary_key=True)  # AUTOINCREMENT, so a replaced entry never reuses a seq
+    table_name = Column(String, nullable=False)  # "areas" or "dimensions"
+    row_id = Column(Integer, nullable=False)
+    area_id = Column(Integer, nullable=True)  # The area itself, or the dimension's area
+    plant_name = Column(String, nullable=True)
+    deleted = Column(Boolean, nullable=False, default=False)
+    
+    __table_args__ = (
+        Index("ix_row_changes_table_name_row_id", "table_name", "row_id", unique=True),
+        {"sqlite_autoincrement": True},
+    )
+
+# Every insert, update or delete on these tables bumps the named data version
+DATA_VERSION_TABLES = {
+    "areas": ["areas", "dimensions"],
+    "maturity_levels": ["maturity_levels"],
+    "rating_scales": ["rating_scales"],
+}
+
+def get_data_version(name):
+    """(version, updated_at) of a data version, read without a session; None if missing"""
+    with read_engine.connect() as conn:
+        return conn.exec_driver_sql(
+            "SELECT version, updated_at FROM data_versions WHERE name = ?", (name,)
+        ).first()
 
 # Create all tables
-def init_db():
-    Base.metadata.create_all(bind=engine)
+def init_db(bind=None):
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    migrate_db(bind)
+
+def migrate_db(bind=None):
+    """Bring an existing database up to date with the models in place.
+
+    create_all only creates missing tables, so columns and indexes added to
+    existing tables are applied here. Every step checks first and is safe
+    to run on each startup.
+    """
+    with (bind or engine).begin() as conn:
+        area_columns = {column["name"] for column in inspect(conn).get_columns("areas")}
+        if "plant_name" not in area_columns:
+            conn.exec_driver_sql("ALTER TABLE areas ADD COLUMN plant_name VARCHAR")
+        
+        # Versions for checksheet edits; existing rows start at 0
+        for table in ["assessments", "checksheet_selections"]:
+            if "version" not in {column["name"] for column in inspect(conn).get_columns(table)}:
+                conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        
+        # Area names used to be unique on their own; they are now unique per plant
+        area_indexes = {index["name"]: index for index in inspect(conn).get_indexes("areas")}
+        if area_indexes.get("ix_areas_name", {}).get("unique"):
+            conn.exec_driver_sql("DROP INDEX ix_areas_name")
+        
+        # Superseded by the (dimension_name, level) index
+        rating_indexes = {index["name"] for index in inspect(conn).get_indexes("rating_scales")}
+        if "ix_rating_scales_dimension_name" in rating_indexes:
+            conn.exec_driver_sql("DROP INDEX ix_rating_scales_dimension_name")
+        
+        # Older databases could hold several rows for the same item in an
+        # assessment. Keep the most recently updated one so the unique index
+        # can be created.
+        selection_indexes = {index["name"] for index in inspect(conn).get_indexes("checksheet_selections")}
+        if "ix_checksheet_selections_assessment_id_maturity_level_id" not in selection_indexes:
+            conn.exec_driver_sql("""
+                DELETE FROM checksheet_selections WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY assessment_id, maturity_level_id
+                            ORDER BY updated_at DESC, id DESC
+                        ) AS position
+                        FROM checksheet_selections
+                        WHERE assessment_id IS NOT NULL
+                    )
+                    WHERE position > 1
+                )
+            """)
+        
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        
+        # Start the level history from the levels already stored (source 0, baseline)
+        if conn.exec_driver_sql("SELECT 1 FROM dimension_level_history LIMIT 1").first() is None:
+            conn.exec_driver_sql("""
+                INSERT INTO dimension_level_history (dimension_id, area_id, current_level, desired_level, source, ts)
+                SELECT id, area_id, current_level, desired_level, 0,
+                       COALESCE(CAST(strftime('%s', updated_at) AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER))
+                FROM dimensions
+                WHERE area_id IS NOT NULL AND current_level IS NOT NULL
+            """)
+        
+        for name, tables in DATA_VERSION_TABLES.items():
+            conn.exec_driver_sql(
+                "INSERT OR IGNORE INTO data_versions (name, version, updated_at) "
+                "VALUES (?, 0, CAST(strftime('%s', 'now') AS INTEGER))",
+                (name,)
+            )
+            for table in tables:
+                for operation in ("INSERT", "UPDATE", "DELETE"):
+                    conn.exec_driver_sql(
+                        f"CREATE TRIGGER IF NOT EXISTS data_version_{table}_{operation.lower()} "
+                        f"AFTER {operation} ON {table} BEGIN "
+                        f"UPDATE data_versions SET version = version + 1, "
+                        f"updated_at = CAST(strftime('%s', 'now') AS INTEGER) WHERE name = '{name}'; "
+                        f"END"
+                    )
+        
+        # Change log for delta sync; seeded with every existing row on first run
+        row_change_sources = {
+            "areas": ("{row}.id", "{row}.plant_name"),
+            "dimensions": ("{row}.area_id", "(SELECT plant_name FROM areas WHERE areas.id = {row}.area_id)"),
+        }
+        for table, (area_id, plant_name) in row_change_sources.items():
+            for operation, row, deleted in (("INSERT", "NEW", 0), ("UPDATE", "NEW", 0), ("DELETE", "OLD", 1)):
+                conn.exec_driver_sql(
+                    f"CREATE TRIGGER IF NOT EXISTS row_changes_{table}_{operation.lower()} "
+                    f"AFTER {operation} ON {table} BEGIN "
+                    f"INSERT OR REPLACE INTO row_changes (table_name, row_id, area_id, plant_name, deleted) "
+                    f"VALUES ('{table}', {row}.id, {area_id.format(row=row)}, {plant_name.format(row=row)}, {deleted}); "
+                    f"END"
+                )
+        if conn.exec_driver_sql("SELECT 1 FROM row_changes LIMIT 1").first() is None:
+            for table, (area_id, plant_name) in row_change_sources.items():
+                conn.exec_driver_sql(
+                    f"INSERT INTO row_changes (table_name, row_id, area_id, plant_name, deleted) "
+                    f"SELECT '{table}', {table}.id, {area_id.format(row=table)}, {plant_name.format(row=table)}, 0 "
+                    f"FROM {table} ORDER BY {table}.id"
+                )
+        
+        # Rollups used to count a bucket from its start even before a dimension's
+        # first level; drop them so they are rebuilt with first_ts below
+        if "first_ts" not in {column["name"] for column in inspect(conn).get_columns("dimension_level_rollups")}:
+            conn.exec_driver_sql("ALTER TABLE dimension_level_rollups ADD COLUMN first_ts INTEGER NOT NULL DEFAULT 0")
+            conn.exec_driver_sql("DELETE FROM dimension_level_rollups")
+        
+        if conn.exec_driver_sql("SELECT 1 FROM dimension_level_rollups LIMIT 1").first() is None:
+            from history import rebuild_rollups
+            rebuild_rollups(conn)
 
 # Dependency
 def get_db():
@@ -121,3 +414,51 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency for endpoints that only read
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Query budgets. Every statement a session runs is counted, including lazy
+# loads and relationship loads, so a forgotten eager load shows up as a
+# blown budget. Over budget is a warning, or an error with
+# MM_QUERY_BUDGET_STRICT=1 (use that when testing).
+QUERY_BUDGET_STRICT = os.environ.get('MM_QUERY_BUDGET_STRICT', '').lower() in ('1', 'true', 'yes')
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+class QueryBudgetWarning(UserWarning):
+    pass
+
+@event.listens_for(Session, "do_orm_execute")
+def count_query(orm_execute_state):
+    info = orm_execute_state.session.info
+    info["queries"] = info.get("queries", 0) + 1
+
+@contextmanager
+def query_budget(db, limit, label="block"):
+    """Check that ``db`` runs at most ``limit`` queries inside the block"""
+    start = db.info.get("queries", 0)
+    yield
+    used = db.info.get("queries", 0) - start
+    if used > limit:
+        message = f"{label} ran {used} queries, over its budget of {limit}"
+        if QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        warnings.warn(message, QueryBudgetWarning, stacklevel=3)
+
+def get_read_db_within(limit, label):
+    """get_read_db for an endpoint that should run at most ``limit`` queries"""
+    def dependency():
+        db = ReadSessionLocal()
+        try:
+            with query_budget(db, limit, label):
+                yield db
+        finally:
+            db.close()
+    return dependency
@@ -0,0 +1,327 @@
+"""
+Dimension level history and trends.
+
+Every write path that changes a dimension's current or desired level appends
+a row to dimension_level_history in the same transaction as the change, so
+trends can be read back by dimension or by area over any time range. Rows
+are compact (integer ids, small-int levels, epoch seconds) and each write
+path records all of its changes with a single executemany.
+
+The same call folds the changes into hourly and daily rollups. A level is a
+step function of time, so a rollup bucket keeps the integral of level over
+time rather than an average of the change events; trends are time-weighted
+averages over whatever buckets the client asks for, read from the coarsest
+rollup that still resolves them.
+"""
+import threading
+import time
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import DimensionLevelHistory, DimensionLevelRollup
+
+# Write path that recorded a row
+SOURCE_BASELINE = 0  # Levels already stored when the history table was created
+SOURCE_EDIT = 1  # PUT /api/mm/dimensions/{id}
+SOURCE_SIMULATION = 2  # POST /api/mm/simulate-update/{id}
+SOURCE_SCORING = 3  # POST /api/mm/calculate-dimension-scores
+SOURCE_REFRESH = 4  # Reports sheet refresh or plant workbook upload
+SOURCE_NAMES = {
+    SOURCE_BASELINE: "baseline",
+    SOURCE_EDIT: "edit",
+    SOURCE_SIMULATION: "simulation",
+    SOURCE_SCORING: "scoring",
+    SOURCE_REFRESH: "refresh",
+}
+
+HOURLY = 3600
+DAILY = 86400
+ROLLUP_RESOLUTIONS = (HOURLY, DAILY)
+RESOLUTION_NAMES = {0: "raw", HOURLY: "hourly", DAILY: "daily"}
+
+MAX_TREND_POINTS = 1000
+
+history_table = DimensionLevelHistory.__table__
+rollup_table = DimensionLevelRollup.__table__
+
+
+def record_levels(db, changes, source, ts=None):
+    """Append a history row per (dimension_id, area_id, current_level, desired_level).
+
+    Nothing is committed; the rows and the rollups they update go in with
+    the caller's transaction. Returns the number of rows written.
+    """
+    ts = int(time.time()) if ts is None else ts
+    rows = [
+        {
+            "dimension_id": dimension_id,
+            "area_id": area_id,
+            "current_level": current_level,
+            "desired_level": desired_level,
+            "source": source,
+            "ts": ts,
+        }
+        for dimension_id, area_id, current_level, desired_level in changes
+    ]
+    if rows:
+        db.execute(insert(history_table), rows)
+        for resolution in ROLLUP_RESOLUTIONS:
+            _update_rollups(db, rows, resolution, ts)
+        db.info["levels_recorded"] = True
+    return len(rows)
+
+
+# Callbacks run after any session commits level changes, e.g. to wake the
+# change stream. They run on the committing thread and must not block.
+_commit_listeners = set()
+_listeners_lock = threading.Lock()
+
+
+def add_commit_listener(callback):
+    with _listeners_lock:
+        _commit_listeners.add(callback)
+
+
+def remove_commit_listener(callback):
+    with _listeners_lock:
+        _commit_listeners.discard(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_commit_listeners(session):
+    if session.info.pop("levels_recorded", False):
+        with _listeners_lock:
+            listeners = list(_commit_listeners)
+        for callback in listeners:
+            callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_levels(session):
+    session.info.pop("levels_recorded", None)
+
+
+def latest_change_id(db):
+    """Id of the newest history row, or 0 if there is none"""
+    return db.execute(select(func.max(history_table.c.id))).scalar() or 0
+
+
+def changes_since(db, after_id, area_ids=None, limit=500, up_to=None):
+    """History rows after ``after_id`` (and up to ``up_to``) in id order, as change events"""
+    query = select(history_table).where(history_table.c.id > after_id)
+    if up_to is not None:
+        query = query.where(history_table.c.id <= up_to)
+    if area_ids:
+        query = query.where(history_table.c.area_id.in_(area_ids))
+    return [
+        {**row, "source": SOURCE_NAMES.get(row["source"], row["source"])}
+        for row in db.execute(query.order_by(history_table.c.id).limit(limit)).mappings()
+    ]
+
+
+def _fold(rollup, previous_level, row, resolution):
+    """Rollup for ``row``'s bucket after applying its level change.
+
+    ``rollup`` is the bucket's current rollup or None; ``previous_level`` is
+    the level the dimension entered the bucket at, or None if it had none,
+    in which case the level is unknown before ``row`` and the bucket's known
+    time (``first_ts``) starts there.
+    """
+    ts = row["ts"]
+    if rollup is None:
+        bucket = ts - ts % resolution
+        first_ts = ts if previous_level is None else bucket
+        return {
+            "resolution": resolution,
+            "dimension_id": row["dimension_id"],
+            "bucket": bucket,
+            "first_ts": first_ts,
+            "area_id": row["area_id"],
+            "close_level": row["current_level"],
+            "level_seconds": (previous_level or 0) * (ts - first_ts),
+            "last_ts": ts,
+            "changes": 1,
+        }
+    return {
+        **rollup,
+        "area_id": row["area_id"],
+        "close_level": row["current_level"],
+        "level_seconds": rollup["level_seconds"] + rollup["close_level"] * max(0, ts - rollup["last_ts"]),
+        "last_ts": max(ts, rollup["last_ts"]),
+        "changes": rollup["changes"] + 1,
+    }
+
+
+def _update_rollups(db, rows, resolution, ts):
+    bucket = ts - ts % resolution
+    dimension_ids = sorted({row["dimension_id"] for row in rows})
+
+    current = {
+        rollup["dimension_id"]: dict(rollup)
+        for rollup in db.execute(
+            select(rollup_table).where(
+                rollup_table.c.resolution == resolution,
+                rollup_table.c.bucket == bucket,
+                rollup_table.c.dimension_id.in_(dimension_ids),
+            )
+        ).mappings()
+    }
+    previous = {
+        dimension_id: close_level
+        for dimension_id, close_level, _ in db.execute(
+            select(rollup_table.c.dimension_id, rollup_table.c.close_level, func.max(rollup_table.c.bucket))
+            .where(
+                rollup_table.c.resolution == resolution,
+                rollup_table.c.bucket < bucket,
+                rollup_table.c.dimension_id.in_([d for d in dimension_ids if d not in current]),
+            )
+            .group_by(rollup_table.c.dimension_id)
+        )
+    }
+
+    for row in rows:
+        dimension_id = row["dimension_id"]
+        current[dimension_id] = _fold(current.get(dimension_id), previous.get(dimension_id), row, resolution)
+
+    statement = sqlite_insert(rollup_table)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["resolution", "dimension_id", "bucket"],
+            set_={name: statement.excluded[name] for name in ["area_id", "close_level", "level_seconds", "last_ts", "changes"]},
+        ),
+        list(current.values())
+    )
+
+
+def rebuild_rollups(db):
+    """Recompute every rollup from dimension_level_history"""
+    db.execute(rollup_table.delete())
+    for resolution in ROLLUP_RESOLUTIONS:
+        rollups = {}
+        levels = {}
+        for row in db.execute(select(history_table).order_by(history_table.c.id)).mappings():
+            key = (row["dimension_id"], row["ts"] - row["ts"] % resolution)
+            rollups[key] = _fold(rollups.get(key), levels.get(row["dimension_id"]), row, resolution)
+            levels[row["dimension_id"]] = row["current_level"]
+        if rollups:
+            db.execute(insert(rollup_table), list(rollups.values()))
+
+
+def level_trend(db, dimension_area_ids, start, end, points):
+    """Time-weighted average level of each dimension over ``points`` buckets.
+
+    ``dimension_area_ids`` maps each dimension to report to its area.
+    [start, end) is split into equal buckets; time after now, or before a
+    dimension's first recorded level, counts as unknown, and a bucket with
+    no known time is None. The source is the coarsest rollup no wider than
+    a bucket, or the raw history for buckets under an hour.
+
+    Returns (timestamps, resolution, {dimension_id: levels}).
+    """
+    width = max(1, -(-(end - start) // points))
+    resolution = max((r for r in ROLLUP_RESOLUTIONS if r <= width), default=0)
+    area_ids = sorted(set(dimension_area_ids.values()))
+    segments = {dimension_id: [] for dimension_id in dimension_area_ids}
+
+    if resolution:
+        first_bucket = start - start % resolution
+        before = db.execute(
+            select(rollup_table.c.dimension_id, rollup_table.c.close_level, func.max(rollup_table.c.bucket))
+            .where(
+                rollup_table.c.resolution == resolution,
+                rollup_table.c.area_id.in_(area_ids),
+                rollup_table.c.bucket < first_bucket,
+            )
+            .group_by(rollup_table.c.dimension_id)
+        )
+        for dimension_id, close_level, _ in before:
+            if dimension_id in segments:
+                segments[dimension_id].append((first_bucket, close_level))
+
+        rollups = db.execute(
+            select(rollup_table)
+            .where(
+                rollup_table.c.resolution == resolution,
+                rollup_table.c.area_id.in_(area_ids),
+                rollup_table.c.bucket >= first_bucket,
+                rollup_table.c.bucket < end,
+            )
+            .order_by(rollup_table.c.bucket)
+        ).mappings()
+        now = int(time.time())
+        for rollup in rollups:
+            if rollup["dimension_id"] not in segments:
+                continue
+            bucket_end = rollup["bucket"] + resolution
+            closed_at = max(min(bucket_end, now), rollup["last_ts"])
+            # The level is unknown before first_ts, so the average covers only the time after it
+            average = (
+                rollup["level_seconds"] + rollup["close_level"] * (closed_at - rollup["last_ts"])
+            ) / max(1, closed_at - rollup["first_ts"])
+            segments[rollup["dimension_id"]] += [(rollup["first_ts"], average), (bucket_end, rollup["close_level"])]
+    else:
+        before = db.execute(
+            select(history_table.c.dimension_id, history_table.c.current_level, func.max(history_table.c.id))
+            .where(history_table.c.area_id.in_(area_ids), history_table.c.ts < start)
+            .group_by(history_table.c.dimension_id)
+        )
+        for dimension_id, current_level, _ in before:
+            if dimension_id in segments:
+                segments[dimension_id].append((start, current_level))
+
+        changes = db.execute(
+            select(history_table.c.dimension_id, history_table.c.current_level, history_table.c.ts)
+            .where(history_table.c.area_id.in_(area_ids), history_table.c.ts >= start, history_table.c.ts < end)
+            .order_by(history_table.c.id)
+        )
+        for dimension_id, current_level, ts in changes:
+            if dimension_id in segments:
+                segments[dimension_id].append((ts, current_level))
+
+    timestamps = [start + i * width for i in range(points)]
+    stop = min(end, int(time.time()))
+    levels = {
+        dimension_id: bucket_averages(steps, timestamps, width, stop)
+        for dimension_id, steps in segments.items()
+    }
+    return timestamps, resolution, levels
+
+
+def bucket_averages(steps, timestamps, width, stop):
+    """Average of a step function over buckets of ``width`` starting at ``timestamps``.
+
+    ``steps`` are (from_ts, value) pairs in order, each value holding until
+    the next pair; a later pair at the same time wins. Time before the first
+    pair or at or after ``stop`` is unknown and left out of the average.
+    """
+    averages = []
+    position = 0
+    for bucket_start in timestamps:
+        bucket_end = min(bucket_start + width, stop)
+        total = 0.0
+        known = 0
+        # Skip the steps that end before this bucket starts
+        while position + 1 < len(steps) and steps[position + 1][0] <= bucket_start:
+            position += 1
+        index = position
+        while index < len(steps) and steps[index][0] < bucket_end:
+            step_start = max(steps[index][0], bucket_start)
+            step_end = min(steps[index + 1][0], bucket_end) if index + 1 < len(steps) else bucket_end
+            if step_end > step_start:
+                total += steps[index][1] * (step_end - step_start)
+                known += step_end - step_start
+            index += 1
+        averages.append(round(total / known, 2) if known else None)
+    return averages
+
+
+def average_series(series, points):
+    """Pointwise mean of several level series, skipping unknown (None) values"""
+    series = list(series)
+    averages = []
+    for index in range(points):
+        known = [levels[index] for levels in series if levels[index] is not None]
+        averages.append(round(sum(known) / len(known), 2) if known else None)
+    return averages
@@ -0,0 +1,1410 @@
+"""
+Workbook ingestion for the M&M refresh endpoints.
+
+MM_Data.xlsx is opened once per refresh and the Reports, Rating Scales and
+Smart Factory CheckSheet sheets are parsed together. Each sheet's layout is
+declared as a SheetSpec (see SHEET_SPECS at the bottom), and the API, the
+load scripts and benchmark_ingestion.py all run a spec through the same
+parse, validate and write pipeline. Each loader diffs the parsed rows against the
+stored ones by natural key and applies only the inserts, updates and deletes,
+as set-based Core statements in a single transaction per sheet, so ids stay
+stable across refreshes.
+
+Each sheet is fingerprinted by the hash of its XML inside the .xlsx archive.
+A sheet whose fingerprint matches the last successful load is skipped and the
+previous counts are returned, and parsed frames are kept in an on-disk cache
+keyed by that hash so they survive restarts.
+
+Very large workbooks are streamed instead: rows come straight out of
+openpyxl's read-only reader into row-at-a-time parsers and are committed in
+fixed-size batches (see MM_INGEST_MODE and MM_INGEST_BATCH_SIZE).
+
+In frame mode the stale sheets can be read and parsed in a process pool
+(MM_INGEST_WORKERS); the database writes always happen one sheet at a time
+on the caller's session.
+"""
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+import uuid
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from database import Area, Dimension, MatrixDocument, MaturityLevel, PlantWorkbook, RatingScale, SheetFingerprint
+from history import SOURCE_REFRESH, record_levels
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+EXCEL_PATH = os.path.join(BACKEND_DIR, 'MM_Data.xlsx')
+
+REPORTS_SHEET = 'Reports'
+RATING_SCALES_SHEET = 'Rating Scales'
+CHECKSHEET_SHEET = 'Smart Factory CheckSheet'
+MATRICES_SHEET = 'Matrices'
+
+REFRESH_SHEETS = [REPORTS_SHEET, RATING_SCALES_SHEET, CHECKSHEET_SHEET, MATRICES_SHEET]
+
+# Parsed sheets are cached on disk; on Vercel /tmp is the only writable directory
+if os.environ.get('VERCEL'):
+    DEFAULT_CACHE_DIR = "/tmp/mm_ingest_cache"
+else:
+    DEFAULT_CACHE_DIR = os.path.join(BACKEND_DIR, '.ingest_cache')
+
+CACHE_DIR = os.environ.get('MM_INGEST_CACHE_DIR', DEFAULT_CACHE_DIR)
+# Least recently used entries are deleted once the cache grows past this
+CACHE_MAX_BYTES = int(float(os.environ.get('MM_INGEST_CACHE_MB', '100')) * 1024 * 1024)
+
+# "frame" parses whole sheets with pandas, "stream" iterates rows with
+# openpyxl's read-only mode, "auto" streams workbooks above the size threshold
+INGEST_MODE = os.environ.get('MM_INGEST_MODE', 'auto')
+STREAM_THRESHOLD_BYTES = int(float(os.environ.get('MM_INGEST_STREAM_MB', '50')) * 1024 * 1024)
+INGEST_BATCH_SIZE = int(os.environ.get('MM_INGEST_BATCH_SIZE', '1000'))
+
+# Plant workbooks uploaded through /api/mm/workbooks are kept here
+UPLOAD_DIR = os.environ.get(
+    'MM_UPLOAD_DIR', "/tmp/mm_uploads" if os.environ.get('VERCEL') else os.path.join(BACKEND_DIR, 'uploads')
+)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(float(os.environ.get('MM_UPLOAD_MAX_MB', '200')) * 1024 * 1024)
+
+# Processes used to read and parse stale sheets in frame mode; 1 parses in-process
+INGEST_WORKERS = int(os.environ.get('MM_INGEST_WORKERS', '1'))
+
+# Skipped or corrected records listed in a sheet's result; the rest are only counted
+MAX_REPORTED_PROBLEMS = 20
+
+_SPREADSHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_RELATIONSHIP_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+# Checksheet columns 2-9 flag which dimension a capability belongs to
+DIMENSION_MAP = {
+    2: "Asset connectivity & OEE",
+    3: "MES & system integration",
+    4: "Traceability & quality",
+    5: "Maintenance & reliability",
+    6: "Logistics & supply chain",
+    7: "Workforce & UX",
+    8: "Sustainability & energy",
+    9: "Multi-plant orchestration"
+}
+
+
+class SheetSpec:
+    """Declarative layout of a workbook sheet and the loader that syncs it.
+
+    Row and column positions (``rows``, ``columns``), the cell values that
+    do not count as data in each column (``skip``), marker text such as the
+    level header tokens (``markers``) and the category map live here and
+    the parsers read them from the spec, so a layout change is a spec
+    change. Every sheet goes through the same pipeline: ``parse_frame`` (or
+    ``parse_rows`` when streaming), ``validate``, then ``write``.
+
+    ``check`` returns None for a parsed record that can be loaded as is, or
+    ``(record, problem)``: the record to load in its place (a corrected
+    copy, or None to skip it) and what was wrong. One bad row never fails
+    the sheet; ``check`` raises ValueError only when the whole sheet is
+    unusable. ``tables`` lists the models the sheet populates, with the
+    result key holding each one's row count.
+    """
+
+    def __init__(self, sheet_name, parse_frame, parse_rows, check, write, tables,
+                 header_rows=0, columns=None, rows=None, skip=None, markers=None,
+                 dimension_map=None, defaults=None):
+        self.sheet_name = sheet_name
+        self.header_rows = header_rows
+        self.columns = columns or {}
+        self.rows = rows or {}
+        self.skip = skip or {}
+        self.markers = markers or {}
+        self.dimension_map = dimension_map or {}
+        self.defaults = defaults or {}
+        self.tables = tables
+        self._parse_frame = parse_frame
+        self._parse_rows = parse_rows
+        self._check = check
+        self._write = write
+
+    @property
+    def width(self):
+        """Number of columns the layout reaches into"""
+        positions = [0]
+        for position in self.columns.values():
+            positions += list(position) if isinstance(position, (list, range)) else [position]
+        return max(positions) + 1
+
+    def parse_frame(self, df):
+        return self._parse_frame(df, self)
+
+    def parse_rows(self, rows):
+        return self._parse_rows(rows, self)
+
+    def validate(self, records, problems=None):
+        """Yield the records as ``check`` corrects them, leaving out the ones it skips.
+
+        Each problem is logged and, if ``problems`` is given, appended to it.
+        """
+        for position, record in enumerate(records, 1):
+            outcome = self._check(record)
+            if outcome is not None:
+                record, problem = outcome
+                message = f"{self.sheet_name} record {position}: {problem}"
+                print(f"⚠️ {message}")
+                if problems is not None:
+                    problems.append(message)
+                if record is None:
+                    continue
+            yield record
+
+    def write(self, db: Session, records, batch_size=None):
+        return self._write(db, records, batch_size)
+
+
+def read_workbook_sheets(excel_path, sheet_names, timings=None):
+    """Open the workbook once and parse the requested sheets into DataFrames.
+
+    If ``timings`` is given, each sheet's read time in seconds is stored in it.
+    """
+    # pandas is imported lazily so the read-only API does not pay for it
+    import pandas as pd
+
+    frames = {}
+    with pd.ExcelFile(excel_path) as workbook:
+        for sheet_name in sheet_names:
+            started = time.perf_counter()
+            frames[sheet_name] = pd.read_excel(workbook, sheet_name=sheet_name, header=None)
+            if timings is not None:
+                timings[sheet_name] = time.perf_counter() - started
+    return frames
+
+
+def sheet_digests(excel_path):
+    """Hash every sheet's XML member in the .xlsx archive, keyed by sheet name.
+
+    Cell text lives in the shared strings part, so it is folded into every
+    sheet's hash; editing one sheet leaves the other hashes unchanged unless
+    the edit touches shared strings.
+    """
+    with zipfile.ZipFile(excel_path) as archive:
+        members = set(archive.namelist())
+        workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+        rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+        targets = {rel.get('Id'): rel.get('Target') for rel in rels}
+
+        shared = b''
+        if 'xl/sharedStrings.xml' in members:
+            shared = archive.read('xl/sharedStrings.xml')
+        shared_digest = hashlib.sha256(shared).digest()
+
+        digests = {}
+        for sheet in workbook.iter(f'{_SPREADSHEET_NS}sheet'):
+            target = targets.get(sheet.get(f'{_RELATIONSHIP_NS}id'), '')
+            member = target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+            if member not in members:
+                continue
+            digest = hashlib.sha256(shared_digest)
+            digest.update(archive.read(member))
+            digests[sheet.get('name')] = digest.hexdigest()
+        return digests
+
+
+def fingerprint_workbook(db: Session, excel_path, sheet_names):
+    """Current fingerprint of each requested sheet.
+
+    When the file's mtime and size match what was stored for every sheet, the
+    stored hashes are reused and the archive is not opened at all.
+    """
+    stat = os.stat(excel_path)
+    stored = {
+        row.sheet_name: row
+        for row in db.query(SheetFingerprint).filter(SheetFingerprint.sheet_name.in_(sheet_names))
+    }
+
+    if all(
+        name in stored
+        and stored[name].file_mtime == stat.st_mtime
+        and stored[name].file_size == stat.st_size
+        for name in sheet_names
+    ):
+        digests = {name: stored[name].sha256 for name in sheet_names}
+    else:
+        digests = sheet_digests(excel_path)
+
+    return {
+        name: {"sha256": digests.get(name), "file_mtime": stat.st_mtime, "file_size": stat.st_size}
+        for name in sheet_names
+    }
+
+
+def _cache_path(sha256):
+    return os.path.join(CACHE_DIR, f"{sha256}.pkl")
+
+
+def read_cached_sheets(excel_path, fingerprints, timings=None):
+    """Parsed frames for the given sheets, from the disk cache where possible.
+
+    Sheets missing from the cache are parsed in a single pass over the
+    workbook and written back to the cache. If ``timings`` is given, each
+    sheet's read time in seconds is stored in it.
+    """
+    import pandas as pd
+
+    timings = {} if timings is None else timings
+    frames = {}
+    for sheet_name, fingerprint in fingerprints.items():
+        if not fingerprint["sha256"]:
+            continue
+        path = _cache_path(fingerprint["sha256"])
+        if os.path.exists(path):
+            started = time.perf_counter()
+            try:
+                frames[sheet_name] = pd.read_pickle(path)
+            except Exception:
+                # Unreadable or written by another pandas version; re-parse it
+                continue
+            timings[sheet_name] = time.perf_counter() - started
+            _touch(path)
+
+    missing = [name for name in fingerprints if name not in frames]
+    if missing:
+        parsed = read_workbook_sheets(excel_path, missing, timings)
+        frames.update(parsed)
+        for sheet_name in missing:
+            sha256 = fingerprints[sheet_name]["sha256"]
+            if sha256:
+                _write_cache(parsed[sheet_name], sha256)
+
+    return frames
+
+
+def _write_cache(df, sha256):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _cache_path(sha256)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        prune_cache(keep=path)
+    except OSError:
+        # The cache is an optimisation; a read-only filesystem must not fail the refresh
+        pass
+
+
+def _touch(path):
+    """Mark a cache entry as recently used"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_cache(max_bytes=None, keep=None):
+    """Delete the least recently used cache entries until the cache fits in ``max_bytes``.
+
+    Every workbook edit and plant upload adds an entry under a new hash, so
+    without this the cache only grows. ``keep`` is never deleted.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name.endswith(".pkl") and entry.path != keep:
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries) + (os.path.getsize(keep) if keep else 0)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Removed by another process
+        total -= size
+
+
+def previous_result(db: Session, sheet_name, fingerprint):
+    """Counts from the last load of this sheet if its content is unchanged, else None"""
+    row = db.query(SheetFingerprint).filter(SheetFingerprint.sheet_name == sheet_name).first()
+    if not row or not row.result or row.sha256 != fingerprint["sha256"]:
+        return None
+
+    result = json.loads(row.result)
+    # The tables may have been cleared or rebuilt since; only trust the stored
+    # counts if they still describe what is in the database
+    for model, key in SHEET_SPECS[sheet_name].tables:
+        if _stored_count(db, model) != result.get(key):
+            return None
+    return result
+
+
+def _stored_count(db: Session, model):
+    """Rows of ``model`` loaded from MM_Data.xlsx, leaving out plant uploads"""
+    query = db.query(model)
+    if model is Area:
+        query = query.filter(Area.plant_name.is_(None))
+    elif model is Dimension:
+        query = query.join(Area).filter(Area.plant_name.is_(None))
+    return query.count()
+
+
+def record_fingerprint(db: Session, sheet_name, fingerprint, result):
+    """Remember the fingerprint and counts of a successful load"""
+    row = db.query(SheetFingerprint).filter(SheetFingerprint.sheet_name == sheet_name).first()
+    if (
+        row
+        and not result.get("rows_written")
+        and (row.sha256, row.file_mtime, row.file_size)
+        == (fingerprint["sha256"], fingerprint["file_mtime"], fingerprint["file_size"])
+    ):
+        # A forced reload that found nothing to change leaves the record as is
+        return
+    if not row:
+        row = SheetFingerprint(sheet_name=sheet_name)
+        db.add(row)
+    row.sha256 = fingerprint["sha256"]
+    row.file_mtime = fingerprint["file_mtime"]
+    row.file_size = fingerprint["file_size"]
+    row.result = json.dumps(result)
+    db.commit()
+
+
+def use_streaming(excel_path, mode=None):
+    """Whether a refresh should stream rows instead of loading whole sheets"""
+    mode = mode or INGEST_MODE
+    if mode == "stream":
+        return True
+    if mode == "frame":
+        return False
+    return os.path.getsize(excel_path) >= STREAM_THRESHOLD_BYTES
+
+
+def refresh_workbook(db: Session, excel_path, sheet_names, force=False, mode=None, progress=None,
+                     workers=None):
+    """Load the requested sheets, skipping any whose content is unchanged.
+
+    In frame mode the stale sheets are read (or taken from the parsed-sheet
+    cache) and parsed, across ``workers`` processes when more than one is
+    configured, and each is then written in a single transaction; results
+    carry ``read_seconds`` and ``parse_seconds`` next to ``write_seconds``. In
+    stream mode rows are read straight from the archive and committed every
+    INGEST_BATCH_SIZE records, which keeps memory bounded on very large
+    workbooks; those loads bypass the parsed-sheet cache.
+
+    ``progress(stage, rows)`` is called as each stage starts and as each
+    sheet finishes, with the number of rows that sheet processed.
+
+    Returns a dict of sheet name to either the loader's result or the
+    exception it raised, so one bad sheet does not abort the others.
+    """
+    progress = progress or (lambda stage, rows=0: None)
+    workers = INGEST_WORKERS if workers is None else workers
+
+    progress("fingerprinting workbook")
+    fingerprints = fingerprint_workbook(db, excel_path, sheet_names)
+
+    outcomes = {}
+    for sheet_name in sheet_names:
+        result = None if force else previous_result(db, sheet_name, fingerprints[sheet_name])
+        if result is not None:
+            # Counts carry over from the last load, but nothing was written this time
+            outcomes[sheet_name] = {
+                **result, "inserted": 0, "updated": 0, "deleted": 0, "rows_written": 0, "unchanged": True
+            }
+
+    stale = {name: fingerprints[name] for name in sheet_names if name not in outcomes}
+    if not stale:
+        return outcomes
+
+    streaming = use_streaming(excel_path, mode)
+    if not streaming:
+        progress("reading workbook")
+        parsed_sheets = parse_sheets(excel_path, stale, workers)
+
+    for sheet_name in stale:
+        spec = SHEET_SPECS[sheet_name]
+        progress(f"loading {sheet_name}")
+        try:
+            if streaming:
+                rows = iter_sheet_rows(excel_path, sheet_name)
+                problems = []
+                result = spec.write(db, spec.validate(spec.parse_rows(rows), problems), INGEST_BATCH_SIZE)
+                result.update(problem_counts(problems))
+            else:
+                parsed = parsed_sheets[sheet_name]
+                if isinstance(parsed, Exception):
+                    raise parsed
+                records, timings = parsed
+                result = {**spec.write(db, records), **timings}
+        except Exception as e:
+            db.rollback()
+            outcomes[sheet_name] = e
+            continue
+        record_fingerprint(db, sheet_name, fingerprints[sheet_name], result)
+        outcomes[sheet_name] = result
+        progress(f"loaded {sheet_name}", result["rows_processed"])
+
+    return outcomes
+
+
+def parse_sheet(excel_path, sheet_name, fingerprint):
+    """Read one sheet (or take it from the cache) and run its frame parser.
+
+    Returns ``(records, timings)``. This is the unit of work handed to the
+    process pool, so it must stay a picklable module-level function.
+    """
+    read_timings = {}
+    frame = read_cached_sheets(excel_path, {sheet_name: fingerprint}, read_timings)[sheet_name]
+    return _parse_frame(SHEET_SPECS[sheet_name], frame, read_timings.get(sheet_name, 0.0))
+
+
+def _parse_frame(spec, frame, read_seconds):
+    """Parse and validate a sheet's frame; returns ``(records, timings)``
+
+    The timings also carry the problem counts from ``problem_counts``.
+    """
+    started = time.perf_counter()
+    records = spec.parse_frame(frame)
+    parsed = time.perf_counter()
+    problems = []
+    records = list(spec.validate(records, problems))
+    return records, {
+        "read_seconds": round(read_seconds, 4),
+        "parse_seconds": round(parsed - started, 4),
+        "validate_seconds": round(time.perf_counter() - parsed, 4),
+        **problem_counts(problems)
+    }
+
+
+def problem_counts(problems):
+    """Result fields for the records validation skipped or corrected"""
+    return {"problem_count": len(problems), "problems": problems[:MAX_REPORTED_PROBLEMS]}
+
+
+def parse_sheets(excel_path, fingerprints, workers=1):
+    """Read and parse the given sheets, in parallel when ``workers`` > 1.
+
+    Returns a dict of sheet name to ``(records, timings)`` or the exception
+    raised for that sheet. Only parsing is spread over processes; the
+    caller writes the results one sheet at a time. Where worker processes
+    cannot be started (some serverless runtimes lack the semaphores
+    multiprocessing needs) the sheets are parsed in-process instead.
+    """
+    if workers > 1 and len(fingerprints) > 1:
+        parsed = _parse_in_pool(
+            {sheet_name: (excel_path, sheet_name, fingerprint) for sheet_name, fingerprint in fingerprints.items()},
+            workers
+        )
+        if parsed is not None:
+            return parsed
+
+    # In-process: read every sheet in one pass over the workbook, then parse each
+    read_timings = {}
+    try:
+        frames = read_cached_sheets(excel_path, fingerprints, read_timings)
+    except Exception as e:
+        return {sheet_name: e for sheet_name in fingerprints}
+
+    parsed = {}
+    for sheet_name in fingerprints:
+        try:
+            parsed[sheet_name] = _parse_frame(
+                SHEET_SPECS[sheet_name], frames[sheet_name], read_timings.get(sheet_name, 0.0)
+            )
+        except Exception as e:
+            parsed[sheet_name] = e
+    return parsed
+
+
+def _parse_in_pool(tasks, workers):
+    """Run ``parse_sheet`` over ``{key: (excel_path, sheet_name, fingerprint)}``.
+
+    Returns a dict of key to ``(records, timings)`` or the exception raised,
+    or None if no worker processes could be started.
+
+    Workers are spawned, not forked: the pool is started from a job thread
+    of a server that runs other threads, and a forked child could inherit
+    locks they hold. A spawned worker only imports this module and its
+    dependencies (database, history), which open no connections on import.
+    """
+    try:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)), mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = {key: pool.submit(parse_sheet, *task) for key, task in tasks.items()}
+            parsed = {}
+            for key, future in futures.items():
+                try:
+                    parsed[key] = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    parsed[key] = e
+            return parsed
+    except (OSError, NotImplementedError, BrokenProcessPool):
+        return None
+
+
+def save_upload(fileobj, filename, upload_dir=None):
+    """Copy an uploaded workbook to the upload directory in fixed-size chunks.
+
+    The file is hashed as it is copied and only renamed into place once
+    complete. Returns ``(path, sha256, size)``; raises ValueError if the
+    upload exceeds MAX_UPLOAD_BYTES or is not an .xlsx archive.
+    """
+    upload_dir = upload_dir or UPLOAD_DIR
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f"{uuid.uuid4().hex}.xlsx")
+    partial = f"{path}.part"
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(partial, "wb") as out:
+            while True:
+                chunk = fileobj.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise ValueError(f"{filename} is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+                digest.update(chunk)
+                out.write(chunk)
+        if not zipfile.is_zipfile(partial):
+            raise ValueError(f"{filename} is not an .xlsx workbook")
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+    return path, digest.hexdigest(), size
+
+
+def ingest_plant_workbooks(db: Session, workbooks, workers=None, progress=None):
+    """Load the Reports sheet of several plant workbooks in one transaction.
+
+    ``workbooks`` is a list of dicts with ``plant_name``, ``filename``,
+    ``path``, ``sha256`` and ``file_size``, as saved by ``save_upload``.
+    Every workbook is parsed first (across ``workers`` processes when more
+    than one is configured); then each plant's areas and dimensions are
+    synced and the upload recorded, and everything is committed together.
+    If any workbook fails nothing is written.
+
+    Only each plant's latest upload is kept on disk: once the new ones are
+    committed, the files of the workbooks they replace are deleted and those
+    rows keep their metadata with ``path`` cleared.
+
+    Returns a list of per-workbook results in input order.
+    """
+    progress = progress or (lambda stage, rows=0: None)
+    workers = INGEST_WORKERS if workers is None else workers
+
+    progress("parsing workbooks")
+    tasks = {}
+    for position, workbook in enumerate(workbooks):
+        sha256 = sheet_digests(workbook["path"]).get(REPORTS_SHEET)
+        if sha256 is None:
+            raise ValueError(f"{workbook['filename']}: workbook has no '{REPORTS_SHEET}' sheet")
+        tasks[position] = (workbook["path"], REPORTS_SHEET, {"sha256": sha256})
+
+    parsed = None
+    if workers > 1 and len(tasks) > 1:
+        parsed = _parse_in_pool(tasks, workers)
+    if parsed is None:
+        parsed = {}
+        for position, task in tasks.items():
+            try:
+                parsed[position] = parse_sheet(*task)
+            except Exception as e:
+                parsed[position] = e
+
+    errors = [
+        f"{workbooks[position]['filename']}: {outcome}"
+        for position, outcome in parsed.items() if isinstance(outcome, Exception)
+    ]
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    results = []
+    try:
+        replaced = (
+            PlantWorkbook.plant_name.in_([workbook["plant_name"] for workbook in workbooks]),
+            PlantWorkbook.path.is_not(None),
+        )
+        superseded = db.execute(select(PlantWorkbook.path).where(*replaced)).scalars().all()
+        db.execute(update(PlantWorkbook.__table__).where(*replaced).values(path=None))
+        for position, workbook in enumerate(workbooks):
+            progress(f"loading {workbook['plant_name']}")
+            areas, timings = parsed[position]
+            result = {
+                **write_reports(db, areas, plant_name=workbook["plant_name"], commit=False),
+                **timings,
+                "plant_name": workbook["plant_name"],
+                "filename": workbook["filename"]
+            }
+            db.add(PlantWorkbook(
+                plant_name=workbook["plant_name"],
+                filename=workbook["filename"],
+                path=workbook["path"],
+                sha256=workbook["sha256"],
+                file_size=workbook["file_size"],
+                result=json.dumps(result)
+            ))
+            results.append(result)
+            progress(f"loaded {workbook['plant_name']}", result["rows_processed"])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    for path in superseded:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Already gone; the row no longer points at it either way
+
+    return results
+
+
+def iter_sheet_rows(excel_path, sheet_name):
+    """Yield a sheet's rows as tuples using openpyxl's read-only mode.
+
+    Only the current row is held in memory. Cell values are normalised the
+    way ``pd.read_excel`` does it so the row parsers see the same values as
+    the frame parsers.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook[sheet_name]
+        # Some writers store a wrong dimension tag, which truncates read-only rows
+        sheet.reset_dimensions()
+        for row in sheet.iter_rows(values_only=True):
+            yield tuple(_normalize_cell(value) for value in row)
+    finally:
+        workbook.close()
+
+
+# Strings pandas reads as missing by default
+_NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+}
+
+
+def _normalize_cell(value):
+    if value is None or (isinstance(value, str) and value in _NA_STRINGS):
+        return None
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def _cell(row, col_idx):
+    return row[col_idx] if col_idx < len(row) else None
+
+
+def _cell_text(row, col_idx):
+    value = _cell(row, col_idx)
+    return "" if value is None else str(value)
+
+
+def _sheet_body(df, spec):
+    """Rows after the spec's header rows, padded out to the columns it reads"""
+    return df.iloc[spec.header_rows:].reindex(columns=range(max(spec.width, len(df.columns))))
+
+
+def _text_column(df, col_idx):
+    """Column as str() of each cell, with empty strings for missing cells"""
+    column = df[col_idx]
+    return column.astype(str).where(column.notna(), "")
+
+
+def parse_reports_frame(df, spec=None):
+    """Parse the Reports sheet into areas with their dimension names.
+
+    Rows after the header rows are either an area header (area name, first
+    dimension and desired level) or a further dimension of the area above it.
+    """
+    import pandas as pd
+
+    spec = spec or REPORTS_SPEC
+    columns = spec.columns
+    body = _sheet_body(df, spec)
+    area_names = _text_column(body, columns["area"])
+    dimension_names = _text_column(body, columns["dimension"])
+
+    is_area = ~area_names.isin(spec.skip["area"])
+    is_dimension = ~dimension_names.isin(spec.skip["dimension"])
+
+    # Anything missing, zero or non-numeric in an area's desired level cell
+    # falls back to the default level
+    level_cells = body[columns["desired_level"]]
+    desired = pd.to_numeric(level_cells, errors="coerce")
+    usable = desired.notna() & (desired.abs() != float("inf")) & ~level_cells.eq(0)
+    desired = desired.where(usable, spec.defaults["desired_level"]).astype(int)
+
+    # Number every row with the area it belongs to; rows before the first
+    # area header get 0 and are dropped
+    area_number = is_area.cumsum()
+    is_dimension &= area_number > 0
+
+    areas = [
+        {"name": name, "desired_level": int(level), "dimensions": []}
+        for name, level in zip(area_names[is_area], desired[is_area])
+    ]
+    for number, name in zip(area_number[is_dimension], dimension_names[is_dimension]):
+        areas[number - 1]["dimensions"].append(name)
+    return areas
+
+
+def stream_reports_rows(rows, spec=None):
+    """Row-at-a-time counterpart of ``parse_reports_frame``.
+
+    Yields each area once the next area header (or the end of the sheet) is
+    reached, so only one area is held in memory.
+    """
+    spec = spec or REPORTS_SPEC
+    columns = spec.columns
+    area = None
+    for idx, row in enumerate(rows):
+        if idx < spec.header_rows:
+            continue
+
+        area_name = _cell_text(row, columns["area"])
+        dimension_name = _cell_text(row, columns["dimension"])
+
+        if area_name not in spec.skip["area"]:
+            if area:
+                yield area
+            area = {
+                "name": area_name,
+                "desired_level": _desired_level(_cell(row, columns["desired_level"]), spec.defaults["desired_level"]),
+                "dimensions": []
+            }
+
+        if area and dimension_name not in spec.skip["dimension"]:
+            area["dimensions"].append(dimension_name)
+
+    if area:
+        yield area
+
+
+def _desired_level(value, default):
+    # pandas turns numeric-looking text into numbers, so "0" counts as zero here
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    if number == 0 or number != number or abs(number) == float("inf"):
+        return default
+    return int(number)
+
+
+def _level_header(text, spec):
+    """(level number, level name) if ``text`` is a level header row, else None"""
+    if not all(token in text for token in spec.markers["level_header"]):
+        return None
+    parts = text.split(":")
+    level_num = int(parts[0].strip().replace("Level", "").strip())
+    return level_num, (parts[1].strip() if len(parts) > 1 else "") or f"Level {level_num}"
+
+
+def parse_checksheet_frame(df, spec=None):
+    """Parse the Smart Factory CheckSheet into maturity level items.
+
+    "Level N: Name" rows in the description column open a level; the
+    capability rows under it carry a sub-level and a description, and the
+    first flagged category column gives the category.
+    """
+    import pandas as pd
+
+    spec = spec or CHECKSHEET_SPEC
+    columns = spec.columns
+    body = _sheet_body(df, spec)
+    sub_levels = _text_column(body, columns["sub_level"])
+    descriptions = _text_column(body, columns["description"])
+
+    is_header = pd.Series(True, index=body.index)
+    for token in spec.markers["level_header"]:
+        is_header &= descriptions.str.contains(token, regex=False)
+
+    # Level number and name only need parsing on the few header rows, then
+    # are carried forward onto the capabilities below them
+    level_number = pd.Series(float("nan"), index=body.index)
+    level_name = pd.Series(None, index=body.index, dtype=object)
+    for idx, text in descriptions[is_header].items():
+        level_number[idx], level_name[idx] = _level_header(text, spec)
+    level_number = level_number.ffill()
+    level_name = level_name.ffill()
+
+    is_item = (
+        ~is_header
+        & ~descriptions.isin(spec.skip["description"])
+        & ~sub_levels.isin(spec.skip["sub_level"])
+        & level_number.notna() & (level_number != 0)
+    )
+
+    # Category is the first category column holding a non-blank value
+    flags = body[[col for col in columns["categories"] if col in body.columns]]
+    flagged = flags.notna() & (flags.astype(str).apply(lambda column: column.str.strip()) != "")
+    category = flagged.idxmax(axis=1).map(spec.dimension_map).fillna(spec.defaults["category"])
+    category = category.astype(object).where(flagged.any(axis=1), None)
+
+    items = pd.DataFrame({
+        "level": level_number[is_item].astype(int),
+        "name": level_name[is_item],
+        "sub_level": sub_levels[is_item],
+        "category": category[is_item],
+        "description": descriptions[is_item].str.strip(),
+    })
+    return items.to_dict("records")
+
+
+def stream_checksheet_rows(rows, spec=None):
+    """Row-at-a-time counterpart of ``parse_checksheet_frame``"""
+    spec = spec or CHECKSHEET_SPEC
+    columns = spec.columns
+    current_level = None
+    current_level_name = None
+
+    for idx, row in enumerate(rows):
+        if idx < spec.header_rows:
+            continue
+
+        description = _cell_text(row, columns["description"])
+        header = _level_header(description, spec)
+        if header:
+            current_level, current_level_name = header
+            continue
+
+        sub_level = _cell_text(row, columns["sub_level"])
+        if (
+            description in spec.skip["description"]
+            or sub_level in spec.skip["sub_level"]
+            or not current_level
+        ):
+            continue
+
+        category = None
+        for col_idx in columns["categories"]:
+            value = _cell(row, col_idx)
+            if value is not None and str(value).strip():
+                category = spec.dimension_map.get(col_idx, spec.defaults["category"])
+                break
+
+        yield {
+            "level": current_level,
+            "name": current_level_name,
+            "sub_level": sub_level,
+            "category": category,
+            "description": description.strip()
+        }
+
+
+def parse_rating_scales_frame(df, spec=None):
+    """Parse the Rating Scales sheet into rating rows.
+
+    Dimension names sit in one row, every third column; the rating name and
+    description for each level are in the level rows of that column and the
+    one next to it, and business relevance for levels 1-3 in the business
+    relevance rows.
+    """
+    import pandas as pd
+
+    spec = spec or RATING_SCALES_SPEC
+    rows = spec.rows
+    name_length = spec.defaults["rating_name_length"]
+
+    dimension_row = df.iloc[rows["dimension_names"]]
+    dimensions = []
+    for col_idx in spec.columns["dimensions"]:
+        if col_idx < len(dimension_row):
+            dim_name = dimension_row.iloc[col_idx]
+            if pd.notna(dim_name) and str(dim_name).strip() and spec.markers["title"] not in str(dim_name):
+                dimensions.append((col_idx, str(dim_name).strip()))
+
+    ratings = []
+    for col_idx, dimension_name in dimensions:
+        for level, level_row_idx in enumerate(rows["levels"], 1):
+            # Get the rating name and description
+            rating_cell = df.iloc[level_row_idx, col_idx]
+            description_cell = df.iloc[level_row_idx, col_idx + 1] if col_idx + 1 < len(df.columns) else None
+
+            # Business relevance is only given for the first few levels
+            business_relevance = None
+            if level <= len(rows["business_relevance"]):
+                business_row_idx = rows["business_relevance"][level - 1]
+                if business_row_idx < len(df):
+                    business_cell = df.iloc[business_row_idx, col_idx + 1]
+                    if pd.notna(business_cell):
+                        business_relevance = str(business_cell).strip()
+
+            if pd.notna(rating_cell):
+                rating_name = str(rating_cell).strip()
+                rating_desc = str(description_cell).strip() if pd.notna(description_cell) else ""
+
+                ratings.append({
+                    "dimension_name": dimension_name,
+                    "level": level,
+                    "rating_name": rating_name[:name_length],
+                    "digital_maturity_description": rating_desc,
+                    "business_relevance": business_relevance
+                })
+    return ratings
+
+
+def stream_rating_scales_rows(rows, spec=None):
+    """Parse the Rating Scales sheet from a row stream.
+
+    The layout is a fixed grid, so only the rows it reaches are read.
+    """
+    import pandas as pd
+
+    spec = spec or RATING_SCALES_SPEC
+    last_row = max(spec.rows["dimension_names"], *spec.rows["levels"], *spec.rows["business_relevance"])
+    return parse_rating_scales_frame(pd.DataFrame(list(itertools.islice(rows, last_row + 1))), spec)
+
+
+def parse_matrices_frame(df, spec=None):
+    """Parse the Matrices sheet into a single document.
+
+    The first row holds the L1-L3 maturity descriptions. Below it, column 0
+    holds category headers (recognised by name) each followed by the
+    metrics and notes of that category.
+    """
+    import pandas as pd
+
+    spec = spec or MATRICES_SPEC
+    columns = spec.columns
+    levels_row = df.reindex(columns=range(max(spec.width, len(df.columns)))).iloc[spec.rows["levels"]]
+
+    maturity_levels = {}
+    for code, col_idx in zip(spec.markers["level_codes"], columns["levels"]):
+        value = levels_row[col_idx]
+        maturity_levels[code] = str(value).strip() if pd.notna(value) else ""
+
+    categories = []
+    for value in df.iloc[spec.header_rows:, columns["text"]].dropna():
+        text = str(value).strip()
+        if any(keyword in text for keyword in spec.markers["categories"]):
+            categories.append({"name": text, "metrics": []})
+        elif categories:
+            categories[-1]["metrics"].append(text)
+
+    return [{"maturity_levels": maturity_levels, "categories": categories}]
+
+
+def stream_matrices_rows(rows, spec=None):
+    """Parse the Matrices sheet from a row stream; the sheet is a few dozen rows"""
+    import pandas as pd
+
+    return parse_matrices_frame(pd.DataFrame(list(rows)), spec)
+
+
+def write_reports(db: Session, areas, batch_size=None, plant_name=None, commit=True):
+    """Sync one plant's areas and dimensions with parsed Reports areas.
+
+    Only areas of ``plant_name`` are compared and deleted; None is the plant
+    of MM_Data.xlsx itself. Without a batch size everything is written in one
+    transaction; with one, a commit follows every ``batch_size`` areas. With
+    ``commit`` False the caller commits.
+    """
+    started = time.perf_counter()
+    area_table = Area.__table__
+    dimension_table = Dimension.__table__
+    area_values = ["description", "desired_level"]
+
+    plant_areas = area_table.c.plant_name.is_not_distinct_from(plant_name)
+    area_index = index_rows(db.execute(select(area_table).where(plant_areas)).mappings(), ["name"])
+    dimension_index = index_rows(
+        db.execute(
+            select(dimension_table)
+            .where(dimension_table.c.area_id.in_(select(area_table.c.id).where(plant_areas)))
+        ).mappings(),
+        ["area_id", "name"]
+    )
+    stored_dimensions = {row["id"]: row for rows in dimension_index.values() for row in rows}
+
+    diffs = []
+    area_count = 0
+    dimension_count = 0
+    for batch in _batched(areas, batch_size):
+        area_diff = match_rows(
+            area_index,
+            [
+                {
+                    "name": area["name"],
+                    "plant_name": plant_name,
+                    "description": f"{area['name']} Digital Maturity Assessment",
+                    "desired_level": area["desired_level"]
+                }
+                for area in batch
+            ],
+            key_columns=["name"],
+            value_columns=area_values
+        )
+        area_ids = apply_diff(db, area_table, area_diff, area_values)
+
+        dimension_diff = match_rows(
+            dimension_index,
+            [
+                {"area_id": area_id, "name": dimension_name, "desired_level": area["desired_level"]}
+                for area, area_id in zip(batch, area_ids)
+                for dimension_name in area["dimensions"]
+            ],
+            key_columns=["area_id", "name"],
+            value_columns=["desired_level"]
+        )
+        # Current level is live assessment state: existing dimensions keep theirs,
+        # new ones start at a simulated level near the target
+        for row in dimension_diff["inserts"]:
+            desired_level = row["desired_level"]
+            row["current_level"] = random.randint(max(1, desired_level - 2), min(desired_level + 1, 5))
+        dimension_ids = apply_diff(db, dimension_table, dimension_diff, ["desired_level"])
+
+        # New dimensions and changed targets go into the level history
+        changes = []
+        inserted = iter(dimension_diff["inserts"])
+        for dimension_id, stored_id in zip(dimension_ids, dimension_diff["ids"]):
+            if stored_id is None:
+                row = next(inserted)
+                changes.append((dimension_id, row["area_id"], row["current_level"], row["desired_level"]))
+        for row in dimension_diff["updates"]:
+            stored = stored_dimensions[row["id"]]
+            changes.append((row["id"], stored["area_id"], stored["current_level"], row["desired_level"]))
+        record_levels(db, changes, SOURCE_REFRESH)
+
+        diffs += [area_diff, dimension_diff]
+        area_count += len(batch)
+        dimension_count += sum(len(area["dimensions"]) for area in batch)
+        if batch_size and commit:
+            db.commit()
+
+    # Areas go last so their dimensions are removed first
+    diffs.append(delete_unmatched(db, dimension_table, dimension_index))
+    diffs.append(delete_unmatched(db, area_table, area_index))
+    if commit:
+        db.commit()
+
+    return {
+        "status": "success",
+        "message": f"Successfully loaded {area_count} areas with {dimension_count} dimensions",
+        "area_count": area_count,
+        "dimension_count": dimension_count,
+        **_write_stats(diffs, started)
+    }
+
+
+def write_maturity_levels(db: Session, items, batch_size=None):
+    """Sync maturity levels with parsed checksheet items"""
+    started = time.perf_counter()
+    table = MaturityLevel.__table__
+    value_columns = ["name", "category", "description"]
+
+    index = index_rows(db.execute(select(table)).mappings(), ["level", "sub_level"])
+    diffs = []
+    count = 0
+    for batch in _batched(items, batch_size):
+        diff = match_rows(index, batch, key_columns=["level", "sub_level"], value_columns=value_columns)
+        apply_diff(db, table, diff, value_columns)
+        diffs.append(diff)
+        count += len(batch)
+        if batch_size:
+            db.commit()
+
+    diffs.append(delete_unmatched(db, table, index))
+    db.commit()
+
+    return {
+        "status": "success",
+        "message": f"Successfully loaded {count} maturity level items",
+        "count": count,
+        **_write_stats(diffs, started)
+    }
+
+
+def write_rating_scales(db: Session, ratings, batch_size=None):
+    """Sync rating scales with parsed Rating Scales rows.
+
+    The sheet holds a few dozen ratings at most, so it is always written in a
+    single transaction.
+    """
+    ratings = list(ratings)
+    dimensions = {rating["dimension_name"] for rating in ratings}
+
+    started = time.perf_counter()
+    table = RatingScale.__table__
+    value_columns = ["rating_name", "digital_maturity_description", "business_relevance"]
+
+    index = index_rows(db.execute(select(table)).mappings(), ["dimension_name", "level"])
+    diff = match_rows(index, ratings, key_columns=["dimension_name", "level"], value_columns=value_columns)
+    apply_diff(db, table, diff, value_columns)
+    deleted = delete_unmatched(db, table, index)
+    db.commit()
+
+    return {
+        "status": "success",
+        "message": "Successfully loaded rating scales",
+        "dimension_count": len(dimensions),
+        "rating_count": len(ratings),
+        **_write_stats([diff, deleted], started)
+    }
+
+
+def write_matrices(db: Session, documents, batch_size=None):
+    """Store the parsed Matrices document as the JSON /api/mm/matrices serves.
+
+    The document is kept in a single row whose sha256 (of the serialized
+    JSON) is the version the endpoint's in-memory copy is checked against.
+    """
+    document = list(documents)[0]
+
+    started = time.perf_counter()
+    table = MatrixDocument.__table__
+    content = json.dumps(document, ensure_ascii=False, separators=(",", ":"))
+    sha256 = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    stored = db.execute(select(table.c.id, table.c.sha256).order_by(table.c.id)).all()
+    diff = {
+        "inserts": [], "updates": [], "delete_ids": [row.id for row in stored[1:]], "unchanged": 0,
+        "ids": [stored[0].id if stored else None]
+    }
+    row = {"sha256": sha256, "content": content}
+    if not stored:
+        diff["inserts"].append(row)
+    elif stored[0].sha256 != sha256:
+        diff["updates"].append({"id": stored[0].id, **row})
+    else:
+        diff["unchanged"] = 1
+    apply_diff(db, table, diff, ["sha256", "content"])
+    if diff["delete_ids"]:
+        db.execute(delete(table).where(table.c.id.in_(diff["delete_ids"])))
+    db.commit()
+
+    categories = document["categories"]
+    return {
+        "status": "success",
+        "message": f"Successfully loaded {len(categories)} matrix categories",
+        "category_count": len(categories),
+        "metric_count": sum(len(category["metrics"]) for category in categories),
+        "document_count": 1,
+        **_write_stats([diff], started)
+    }
+
+
+def _batched(rows, batch_size):
+    """Split an iterable into lists of ``batch_size``; one list if no size is given"""
+    if not batch_size:
+        yield list(rows)
+        return
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def index_rows(existing, key_columns):
+    """Stored rows grouped by natural key, oldest id first"""
+    index = {}
+    for row in sorted(existing, key=lambda row: row["id"]):
+        index.setdefault(tuple(row[column] for column in key_columns), []).append(row)
+    return index
+
+
+def match_rows(index, rows, key_columns, value_columns):
+    """Keyed diff of parsed rows against an ``index_rows`` index.
+
+    A match whose ``value_columns`` differ becomes an update of the stored
+    row's id and an unmatched parsed row an insert. Matched rows are taken
+    out of the index, so whatever is left once every batch has been matched
+    is stale; see ``delete_unmatched``. Repeated keys are paired up in order,
+    so ids stay stable either way.
+    """
+    inserts, updates, ids = [], [], []
+    unchanged = 0
+    for row in rows:
+        matches = index.get(tuple(row[column] for column in key_columns))
+        if not matches:
+            inserts.append(dict(row))
+            ids.append(None)
+            continue
+        stored = matches.pop(0)
+        ids.append(stored["id"])
+        if any(stored[column] != row[column] for column in value_columns):
+            updates.append({"id": stored["id"], **{column: row[column] for column in value_columns}})
+        else:
+            unchanged += 1
+
+    return {"inserts": inserts, "updates": updates, "delete_ids": [], "unchanged": unchanged, "ids": ids}
+
+
+def apply_diff(db: Session, table, diff, value_columns):
+    """Write a ``match_rows`` diff with one executemany per statement kind.
+
+    Returns the ids of the diffed rows in input order, including the ids the
+    inserts were given.
+    """
+    ids = list(diff["ids"])
+    if diff["inserts"]:
+        inserted_ids = iter(db.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            diff["inserts"]
+        ).scalars().all())
+        ids = [row_id if row_id is not None else next(inserted_ids) for row_id in ids]
+    if diff["updates"]:
+        # Bind names must not clash with the column names being SET
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values({column: bindparam(f"_{column}") for column in value_columns}),
+            [{f"_{key}": value for key, value in row.items()} for row in diff["updates"]]
+        )
+    return ids
+
+
+def delete_unmatched(db: Session, table, index):
+    """Delete the stored rows no parsed row matched; returns them as a diff"""
+    delete_ids = [row["id"] for matches in index.values() for row in matches]
+    for chunk in _batched(delete_ids, 500):
+        db.execute(delete(table).where(table.c.id.in_(chunk)))
+    return {"inserts": [], "updates": [], "delete_ids": delete_ids, "unchanged": 0}
+
+
+def _write_stats(diffs, started):
+    """Write counts and throughput of a sync started at ``started``.
+
+    ``rows_per_second`` is measured over every parsed row the sync compared,
+    so an unchanged refresh still reports how fast it got through the sheet.
+    """
+    elapsed = time.perf_counter() - started
+    inserted = sum(len(diff["inserts"]) for diff in diffs)
+    updated = sum(len(diff["updates"]) for diff in diffs)
+    deleted = sum(len(diff["delete_ids"]) for diff in diffs)
+    processed = inserted + updated + sum(diff["unchanged"] for diff in diffs)
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": deleted,
+        "rows_written": inserted + updated + deleted,
+        "rows_processed": processed,
+        "write_seconds": round(elapsed, 4),
+        "rows_per_second": round(processed / elapsed) if elapsed > 0 else processed
+    }
+
+
+# Each sheet's frame parser, row-stream parser and writer
+def check_area(area):
+    if not area["name"].strip():
+        return None, "area name is empty, skipped"
+    if not 1 <= area["desired_level"] <= 5:
+        level = min(max(area["desired_level"], 1), 5)
+        return (
+            {**area, "desired_level": level},
+            f"{area['name']}: desired level {area['desired_level']} is outside 1-5, clamped to {level}"
+        )
+    return None
+
+
+def check_maturity_item(item):
+    if item["level"] < 1:
+        return None, f"{item['sub_level']}: level {item['level']} is below 1, skipped"
+    return None
+
+
+def check_matrices(document):
+    if not document["categories"]:
+        raise ValueError(f"{MATRICES_SHEET}: no category headers found")
+    return None
+
+
+def check_rating(rating):
+    if not rating["rating_name"].strip():
+        return None, f"{rating['dimension_name']} level {rating['level']}: rating name is empty, skipped"
+    return None
+
+
+# Reports: after three header rows, an area header row carries the area
+# name, its first dimension and the desired level; following rows add
+# further dimensions to it
+REPORTS_SPEC = SheetSpec(
+    REPORTS_SHEET,
+    parse_frame=parse_reports_frame,
+    parse_rows=stream_reports_rows,
+    check=check_area,
+    write=write_reports,
+    tables=[(Area, "area_count"), (Dimension, "dimension_count")],
+    header_rows=3,
+    columns={"area": 0, "dimension": 1, "desired_level": 8},
+    skip={"area": {"", "nan"}, "dimension": {"", "nan", "Dimension"}},
+    defaults={"desired_level": 3}
+)
+
+# Rating Scales: a fixed grid with one dimension every third column
+RATING_SCALES_SPEC = SheetSpec(
+    RATING_SCALES_SHEET,
+    parse_frame=parse_rating_scales_frame,
+    parse_rows=stream_rating_scales_rows,
+    check=check_rating,
+    write=write_rating_scales,
+    tables=[(RatingScale, "rating_count")],
+    columns={"dimensions": [0, 3, 6, 9, 12, 15, 18, 21, 24, 27]},
+    rows={
+        "dimension_names": 5,
+        "levels": range(9, 14),  # Levels 1-5
+        "business_relevance": range(18, 21)  # Levels 1-3 only
+    },
+    markers={"title": "Digital Maturity"},  # Title cells in the dimension row
+    defaults={"rating_name_length": 200}
+)
+
+# Smart Factory CheckSheet: "Level N: Name" rows open a level, the rows
+# under it are capabilities flagged in one of the category columns
+CHECKSHEET_SPEC = SheetSpec(
+    CHECKSHEET_SHEET,
+    parse_frame=parse_checksheet_frame,
+    parse_rows=stream_checksheet_rows,
+    check=check_maturity_item,
+    write=write_maturity_levels,
+    tables=[(MaturityLevel, "count")],
+    header_rows=3,
+    columns={"sub_level": 0, "description": 1, "categories": range(2, 11)},
+    skip={"sub_level": {"", "nan"}, "description": {"", "nan", "SUV"}},
+    markers={"level_header": ("Level", ":")},  # Both appear in a level header
+    dimension_map=DIMENSION_MAP,
+    defaults={"category": "General"}
+)
+
+# Matrices: L1-L3 descriptions across the first row, then category headers
+# in column 0 each followed by their metrics
+MATRICES_SPEC = SheetSpec(
+    MATRICES_SHEET,
+    parse_frame=parse_matrices_frame,
+    parse_rows=stream_matrices_rows,
+    check=check_matrices,
+    write=write_matrices,
+    tables=[(MatrixDocument, "document_count")],
+    header_rows=1,
+    columns={"text": 0, "levels": [1, 2, 3]},
+    rows={"levels": 0},
+    markers={
+        "level_codes": ["L1", "L2", "L3"],
+        "categories": ["Operations & Flow", "Quality & Traceability", "Assets, Maintenance & Energy"]
+    }
+)
+
+SHEET_SPECS = {
+    spec.sheet_name: spec for spec in [REPORTS_SPEC, RATING_SCALES_SPEC, CHECKSHEET_SPEC, MATRICES_SPEC]
+}
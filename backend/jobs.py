@@ -0,0 +1,154 @@
+"""
+Background job runner for long-running M&M operations such as workbook refreshes.
+
+Jobs run on a small thread pool and report their stage, rows processed and
+elapsed time so clients can poll them instead of holding a request open.
+A job submitted while another with the same key is still active attaches to
+that job rather than starting a second copy. Jobs sharing a lock key wait
+their turn in the runner rather than on a pool thread.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+JOB_WORKERS = int(os.environ.get('MM_JOB_WORKERS', '2'))
+
+# Finished jobs are kept for polling until this many newer jobs have been submitted
+MAX_FINISHED_JOBS = 100
+
+
+class Job:
+    def __init__(self, kind, key):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = "queued"
+        self.stage = "queued"
+        self.rows_processed = 0
+        self.result = None
+        self.error = None
+        self.submitted_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self._started = None
+        self._finished = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def progress(self, stage, rows=0):
+        """Record the current stage and add ``rows`` to the processed count"""
+        self.stage = stage
+        self.rows_processed += rows
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _start(self):
+        self.status = "running"
+        self.stage = "starting"
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+
+    def _finish(self, status, result=None, error=None):
+        self.status = status
+        self.stage = "done" if status == "succeeded" else "failed"
+        self.result = result
+        self.error = error
+        self.finished_at = datetime.utcnow()
+        self._finished = time.perf_counter()
+        self._done.set()
+
+    def to_dict(self):
+        elapsed = 0.0
+        if self._started is not None:
+            elapsed = (self._finished or time.perf_counter()) - self._started
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "rows_processed": self.rows_processed,
+            "elapsed_seconds": round(elapsed, 3),
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobRunner:
+    def __init__(self, max_workers=JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mm-job")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._active = {}
+        # Jobs sharing a lock key (e.g. the same workbook) never run at the same
+        # time: while one runs, the others queue here in submission order
+        self._waiting = {}
+
+    def submit(self, kind, key, fn, lock_key=None):
+        """Run ``fn(job)`` in the background; returns ``(job, created)``.
+
+        If a job with the same key is still queued or running, that job is
+        returned with ``created`` False and ``fn`` is not run. A job whose
+        ``lock_key`` is held by a queued or running job is only handed to
+        the pool once the jobs before it have finished.
+        """
+        with self._lock:
+            job = self._active.get(key)
+            if job is not None:
+                return job, False
+            job = Job(kind, key)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._prune()
+            waiting = self._waiting.get(lock_key)
+            if waiting is not None:
+                waiting.append((job, fn))
+                return job, True
+            self._waiting[lock_key] = deque()
+
+        self._executor.submit(self._run, job, fn, lock_key)
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, lock_key):
+        try:
+            job._start()
+            try:
+                result = fn(job)
+            except Exception as e:
+                job._finish("failed", error=str(e))
+            else:
+                job._finish("succeeded", result=result)
+        finally:
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+                waiting = self._waiting[lock_key]
+                if waiting:
+                    job, fn = waiting.popleft()
+                else:
+                    del self._waiting[lock_key]
+                    job = None
+            if job is not None:
+                self._executor.submit(self._run, job, fn, lock_key)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+runner = JobRunner()
@@ -1,19 +1,38 @@
+import asyncio
+import base64
 from contextlib import closing
 from pathlib import Path
 import sqlite3
 from typing import Dict, List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+import json
 import random
 import os
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
 
-from database import get_db, Area, Dimension, MaturityLevel, RatingScale, Assessment, DimensionAssessment, ChecksheetSelection
+from database import get_db, get_read_db, get_read_db_within, get_data_version, SessionLocal, ReadSessionLocal, Area, Dimension, MaturityLevel, RatingScale, Assessment, DimensionAssessment, ChecksheetSelection, PlantWorkbook, MatrixDocument, RowChange
 from database import init_db as init_sqlalchemy_db
+from ingestion import (
+    EXCEL_PATH, REFRESH_SHEETS, REPORTS_SHEET, RATING_SCALES_SHEET, CHECKSHEET_SHEET, MATRICES_SHEET,
+    ingest_plant_workbooks, refresh_workbook, save_upload,
+)
+import jobs
+from responses import EncodedBody, VersionedBodies, json_response
+from history import (
+    MAX_TREND_POINTS, RESOLUTION_NAMES, SOURCE_EDIT, SOURCE_SCORING, SOURCE_SIMULATION,
+    add_commit_listener, average_series, changes_since, latest_change_id, level_trend, record_levels,
+    remove_commit_listener,
+)
 
 app = FastAPI(title="Mahindra and Mahindra WP1 Simulation Engine")
 
@@ -22,6 +41,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Initialize database on startup (only for local development)
@@ -43,6 +63,7 @@ async def root():
             "areas": "/api/mm/areas",
             "maturity_levels": "/api/mm/maturity-levels",
             "rating_scales": "/api/mm/rating-scales",
+            "matrices": "/api/mm/matrices",
             "assessments": "/api/mm/assessments"
         }
     }
@@ -51,35 +72,54 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
-@app.post("/api/mm/refresh-all-data")
-def refresh_all_data(db: Session = Depends(get_db)):
-    """Master endpoint to refresh ALL data: reports, rating scales, and maturity levels"""
+@app.post("/api/mm/refresh-all-data", status_code=202)
+def refresh_all_data(response: Response, force: bool = False, wait: Optional[bool] = None):
+    """Master endpoint to refresh ALL data: reports, rating scales, and maturity levels
+
+    Runs as a background job; poll /api/mm/jobs/{job_id} for progress, or pass
+    wait=true to block until it finishes and get the results directly (the
+    default on Vercel, see WAIT_FOR_JOBS).
+    """
+    excel_path = get_excel_path()
+    return _submit_refresh(
+        "refresh-all-data", excel_path, force, response, wait,
+        lambda job: _refresh_all(job, excel_path, force)
+    )
+
+
+def _refresh_all(job, excel_path: str, force: bool):
     results = {}
     errors = []
     
+    # Open the workbook once and load all three sheets together; sheets whose
+    # content has not changed since the last refresh are skipped
+    db = SessionLocal()
     try:
-        # 1. Refresh Reports Data (Areas and Dimensions)
-        reports_result = refresh_reports_data(db)
-        results['reports'] = reports_result
+        outcomes = refresh_workbook(db, excel_path, REFRESH_SHEETS, force=force, progress=job.progress)
     except Exception as e:
-        errors.append(f"Reports: {str(e)}")
-        results['reports'] = {"status": "error", "message": str(e)}
-    
-    try:
-        # 2. Refresh Rating Scales
-        rating_result = refresh_rating_scales(db)
-        results['rating_scales'] = rating_result
-    except Exception as e:
-        errors.append(f"Rating Scales: {str(e)}")
-        results['rating_scales'] = {"status": "error", "message": str(e)}
+        db.rollback()
+        message = f"Error reading Excel file: {str(e)}"
+        return {
+            "status": "error",
+            "message": message,
+            "errors": [message],
+            "results": {}
+        }
+    finally:
+        db.close()
     
-    try:
-        # 3. Refresh Maturity Levels (Checksheet)
-        maturity_result = refresh_simulated_data(db)
-        results['maturity_levels'] = maturity_result
-    except Exception as e:
-        errors.append(f"Maturity Levels: {str(e)}")
-        results['maturity_levels'] = {"status": "error", "message": str(e)}
+    for key, label, sheet_name in [
+        ('reports', 'Reports', REPORTS_SHEET),                  # 1. Areas and Dimensions
+        ('rating_scales', 'Rating Scales', RATING_SCALES_SHEET),  # 2. Rating Scales
+        ('maturity_levels', 'Maturity Levels', CHECKSHEET_SHEET),  # 3. Maturity Levels (Checksheet)
+        ('matrices', 'Matrices', MATRICES_SHEET),                # 4. Metrics framework (Matrices)
+    ]:
+        outcome = outcomes[sheet_name]
+        if isinstance(outcome, Exception):
+            errors.append(f"{label}: {str(outcome)}")
+            results[key] = {"status": "error", "message": str(outcome)}
+        else:
+            results[key] = outcome
     
     if errors:
         return {
@@ -96,6 +136,171 @@ def refresh_all_data(db: Session = Depends(get_db)):
         }
 
 
+def get_excel_path() -> str:
+    """Path to MM_Data.xlsx in the backend directory"""
+    if not os.path.exists(EXCEL_PATH):
+        raise HTTPException(status_code=404, detail=f"Excel file not found at {EXCEL_PATH}")
+    return EXCEL_PATH
+
+
+def _submit_refresh(kind: str, excel_path: str, force: bool, response: Response, wait: Optional[bool], fn):
+    """Run a refresh as a background job, attaching to one already running.
+
+    Refreshes of the same workbook never run concurrently; a second request
+    of the same kind and ``force`` joins the active job instead of starting
+    another.
+    """
+    return _submit_job(kind, (kind, excel_path, force), excel_path, response, wait, fn)
+
+
+# Serverless instances freeze once a response is sent and do not share job
+# state, so there jobs run to completion within the request unless the
+# client asks otherwise
+WAIT_FOR_JOBS = bool(os.environ.get('VERCEL'))
+
+
+def _submit_job(kind: str, key, lock_key, response: Response, wait: Optional[bool], fn, on_attach=None):
+    """Submit ``fn`` to the job runner and shape the response for ``wait``
+
+    ``on_attach`` is called if the request joined a job already running,
+    in which case ``fn`` never runs.
+    """
+    job, created = jobs.runner.submit(kind, key, fn, lock_key=lock_key)
+    if not created and on_attach is not None:
+        on_attach()
+    
+    if wait is None:
+        wait = WAIT_FOR_JOBS
+    if wait:
+        job.wait()
+        if job.status == "failed":
+            raise HTTPException(status_code=500, detail=job.error)
+        response.status_code = 200
+        return job.result
+    
+    return {
+        **job.to_dict(),
+        "attached": not created,
+        "poll_url": f"/api/mm/jobs/{job.id}"
+    }
+
+
+def _refresh_sheet(job, excel_path: str, sheet_name: str, error_prefix: str, force: bool):
+    """Load a single sheet for the standalone refresh endpoints"""
+    db = SessionLocal()
+    try:
+        outcome = refresh_workbook(db, excel_path, [sheet_name], force=force, progress=job.progress)[sheet_name]
+    except Exception as e:
+        db.rollback()
+        raise Exception(f"{error_prefix}: {str(e)}")
+    finally:
+        db.close()
+    if isinstance(outcome, Exception):
+        raise Exception(f"{error_prefix}: {str(outcome)}")
+    return outcome
+
+
+@app.post("/api/mm/workbooks", status_code=202)
+def upload_workbooks(
+    response: Response,
+    files: List[UploadFile] = File(...),
+    plant: List[str] = Form(...),
+    wait: Optional[bool] = None
+):
+    """Upload one or more plant workbooks and load their Reports sheets
+
+    Each file is paired with the plant field at the same position. Uploads
+    are copied to disk in chunks, then every workbook is loaded in a single
+    transaction by a background job, so either all plants update or none do.
+    """
+    if len(plant) != len(files):
+        raise HTTPException(status_code=400, detail="Provide one plant for each uploaded file")
+    plants = [name.strip() for name in plant]
+    if not all(plants):
+        raise HTTPException(status_code=400, detail="Plant names must not be empty")
+    if len(set(plants)) != len(plants):
+        raise HTTPException(status_code=400, detail="Each plant may only be uploaded once per batch")
+    
+    workbooks = []
+    try:
+        for upload, plant_name in zip(files, plants):
+            if not (upload.filename or "").lower().endswith(".xlsx"):
+                raise ValueError(f"{upload.filename} is not an .xlsx file")
+            path, sha256, size = save_upload(upload.file, upload.filename)
+            workbooks.append({
+                "plant_name": plant_name,
+                "filename": upload.filename,
+                "path": path,
+                "sha256": sha256,
+                "file_size": size
+            })
+    except Exception as e:
+        _remove_uploads(workbooks)
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise
+    
+    # Re-posting an identical batch while it is still loading joins that job,
+    # and this request's copies of the files are not needed
+    key = ("ingest-workbooks", tuple((w["plant_name"], w["sha256"]) for w in workbooks))
+    return _submit_job(
+        "ingest-workbooks", key, "plant-workbooks", response, wait,
+        lambda job: _ingest_workbooks(job, workbooks),
+        on_attach=lambda: _remove_uploads(workbooks)
+    )
+
+
+def _remove_uploads(workbooks):
+    """Delete saved uploads that will not get a PlantWorkbook row"""
+    for workbook in workbooks:
+        try:
+            os.remove(workbook["path"])
+        except FileNotFoundError:
+            pass
+
+
+def _ingest_workbooks(job, workbooks):
+    db = SessionLocal()
+    try:
+        results = ingest_plant_workbooks(db, workbooks, progress=job.progress)
+    except Exception as e:
+        _remove_uploads(workbooks)
+        raise Exception(f"Error loading plant workbooks: {str(e)}")
+    finally:
+        db.close()
+    return {
+        "status": "success",
+        "message": f"Loaded {len(results)} plant workbook(s)",
+        "results": results
+    }
+
+
+@app.get("/api/mm/workbooks")
+def get_workbooks(db: Session = Depends(get_read_db)):
+    """Plant workbooks uploaded so far, most recent first"""
+    return [
+        {
+            "id": workbook.id,
+            "plant_name": workbook.plant_name,
+            "filename": workbook.filename,
+            "sha256": workbook.sha256,
+            "file_size": workbook.file_size,
+            "uploaded_at": workbook.uploaded_at.isoformat(),
+            "result": json.loads(workbook.result) if workbook.result else None
+        }
+        for workbook in db.query(PlantWorkbook).order_by(PlantWorkbook.id.desc()).all()
+    ]
+
+
+@app.get("/api/mm/jobs/{job_id}")
+def get_job(job_id: str):
+    """Stage, rows processed and elapsed time of a background job"""
+    job = jobs.runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
 # Old SQLite DB_PATH - only used for legacy functions if needed
 # In Vercel serverless, use /tmp directory
 if os.environ.get('VERCEL'):
@@ -114,18 +319,24 @@ class AppMetrics(BaseModel):
 
 
 def calculate_confidence(metrics: AppMetrics):
-    avg_score = metrics.dc + metrics.tf + metrics.dr + metrics.der + metrics.er
-    conf_pct = (avg_score / 25) * 100
+    return score_confidence([(metrics.dc, metrics.tf, metrics.dr, metrics.der, metrics.er, metrics.gross)])[0]
 
-    if conf_pct >= 75:
-        band = "High (Committable)"
-    elif conf_pct >= 50:
-        band = "Medium (Conditional)"
-    else:
-        band = "Low (Aspirational)"
 
-    weighted = (conf_pct / 100) * metrics.gross
-    return round(conf_pct, 1), band, round(weighted, 2)
+def score_confidence(rows):
+    """Confidence, band and weighted value for each (dc, tf, dr, der, er, gross) row"""
+    scores = []
+    for dc, tf, dr, der, er, gross in rows:
+        conf_pct = (dc + tf + dr + der + er) / 25 * 100
+
+        if conf_pct >= 75:
+            band = "High (Committable)"
+        elif conf_pct >= 50:
+            band = "Medium (Conditional)"
+        else:
+            band = "Low (Aspirational)"
+
+        scores.append((round(conf_pct, 1), band, round(conf_pct / 100 * gross, 2)))
+    return scores
 
 
 def get_connection() -> sqlite3.Connection:
@@ -390,102 +601,148 @@ def init_old_sqlite_db() -> None:
 # in database.py and api/index.py for serverless
 
 
-@app.get("/api/v1/portfolio")
-async def get_portfolio_simulation():
-    with closing(get_connection()) as conn:
-        cur = conn.cursor()
+# Tables the portfolio payload is built from. Triggers on each one bump
+# portfolio_version, so a cached payload is reused until any of them changes.
+PORTFOLIO_TABLES = [
+    "segments", "apps", "app_findings", "governance_raci", "governance_gates", "change_plan", "stakeholders",
+]
+
+_portfolio_cache = (None, None)
+_portfolio_triggers_ready = False
+
+
+def ensure_portfolio_version(conn: sqlite3.Connection) -> None:
+    """Create the portfolio_version counter and the triggers that bump it"""
+    statements = [
+        "CREATE TABLE IF NOT EXISTS portfolio_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO portfolio_version (id, version) VALUES (1, 0)",
+    ]
+    for table in PORTFOLIO_TABLES:
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS portfolio_version_{table}_{operation.lower()} "
+                f"AFTER {operation} ON {table} "
+                f"BEGIN UPDATE portfolio_version SET version = version + 1 WHERE id = 1; END"
+            )
+    with conn:
+        for statement in statements:
+            conn.execute(statement)
 
-        segments = cur.execute("SELECT id, name FROM segments ORDER BY id").fetchall()
-        portfolio: List[Dict] = []
-
-        for seg in segments:
-            apps_for_segment = cur.execute(
-                "SELECT * FROM apps WHERE segment_id = ? ORDER BY id", (seg["id"],)
-            ).fetchall()
-
-            app_payload = []
-            for app_row in apps_for_segment:
-                findings = [
-                    row["detail"]
-                    for row in cur.execute(
-                        "SELECT detail FROM app_findings WHERE app_id = ? ORDER BY id",
-                        (app_row["id"],),
-                    ).fetchall()
-                ]
-
-                confidence, band, weighted = calculate_confidence(
-                    AppMetrics(
-                        dc=app_row["dc"],
-                        tf=app_row["tf"],
-                        dr=app_row["dr"],
-                        der=app_row["der"],
-                        er=app_row["er"],
-                        gross=app_row["gross"],
-                    )
-                )
-
-                app_payload.append(
-                    {
-                        "id": app_row["id"],
-                        "name": app_row["name"],
-                        "gross": app_row["gross"],
-                        "dc": app_row["dc"],
-                        "tf": app_row["tf"],
-                        "dr": app_row["dr"],
-                        "der": app_row["der"],
-                        "er": app_row["er"],
-                        "strategy": app_row["strategy"],
-                        "findings": findings,
-                        "confidence": confidence,
-                        "band": band,
-                        "weighted": weighted,
-                    }
-                )
-
-            portfolio.append(
-                {
-                    "segment": seg["name"],
-                    "apps": app_payload,
-                    "total_weighted": round(sum(app["weighted"] for app in app_payload), 2),
-                }
+
+def build_portfolio(cur: sqlite3.Cursor) -> Dict:
+    """Assemble the portfolio payload in a fixed number of queries"""
+    app_rows = cur.execute(
+        """
+        SELECT segments.id AS segment_id, segments.name AS segment,
+               apps.id, apps.name, apps.gross, apps.dc, apps.tf, apps.dr, apps.der, apps.er, apps.strategy
+        FROM segments LEFT JOIN apps ON apps.segment_id = segments.id
+        ORDER BY segments.id, apps.id
+        """
+    ).fetchall()
+
+    findings: Dict[str, List[str]] = {}
+    for app_id, detail in cur.execute("SELECT app_id, detail FROM app_findings ORDER BY id"):
+        findings.setdefault(app_id, []).append(detail)
+
+    scores = iter(score_confidence(
+        (row["dc"], row["tf"], row["dr"], row["der"], row["er"], row["gross"])
+        for row in app_rows if row["id"] is not None
+    ))
+
+    portfolio: List[Dict] = []
+    segment_apps: Dict[int, List[Dict]] = {}
+    for row in app_rows:
+        if row["segment_id"] not in segment_apps:
+            segment_apps[row["segment_id"]] = []
+            portfolio.append({"segment": row["segment"], "apps": segment_apps[row["segment_id"]]})
+        if row["id"] is None:
+            continue  # Segment without apps
+
+        confidence, band, weighted = next(scores)
+        segment_apps[row["segment_id"]].append(
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "gross": row["gross"],
+                "dc": row["dc"],
+                "tf": row["tf"],
+                "dr": row["dr"],
+                "der": row["der"],
+                "er": row["er"],
+                "strategy": row["strategy"],
+                "findings": findings.get(row["id"], []),
+                "confidence": confidence,
+                "band": band,
+                "weighted": weighted,
+            }
+        )
+
+    for segment in portfolio:
+        segment["total_weighted"] = round(sum(app["weighted"] for app in segment["apps"]), 2)
+
+    governance = {
+        "raci": [
+            {
+                "task": row["task"],
+                "ddo": row["ddo"],
+                "it": row["it"],
+                "board": row["board"],
+            }
+            for row in cur.execute("SELECT task, ddo, it, board FROM governance_raci ORDER BY id")
+        ],
+        "gates": [row["gate"] for row in cur.execute("SELECT gate FROM governance_gates ORDER BY id")],
+    }
+
+    change_management = {
+        "comms_plan": [
+            {
+                "week": row["week"],
+                "title": row["title"],
+                "desc": row["desc"],
+            }
+            for row in cur.execute("SELECT week, title, desc FROM change_plan ORDER BY id")
+        ],
+        "stakeholders": [
+            {
+                "name": row["name"],
+                "impact": row["impact"],
+                "focus": row["focus"],
+                "strategy": row["strategy"],
+            }
+            for row in cur.execute(
+                "SELECT name, impact, focus, strategy FROM stakeholders ORDER BY id"
             )
+        ],
+    }
 
-        governance = {
-            "raci": [
-                {
-                    "task": row["task"],
-                    "ddo": row["ddo"],
-                    "it": row["it"],
-                    "board": row["board"],
-                }
-                for row in cur.execute("SELECT task, ddo, it, board FROM governance_raci ORDER BY id")
-            ],
-            "gates": [row["gate"] for row in cur.execute("SELECT gate FROM governance_gates ORDER BY id")],
-        }
+    return {"portfolio": portfolio, "governance": governance, "change_management": change_management}
 
-        change_management = {
-            "comms_plan": [
-                {
-                    "week": row["week"],
-                    "title": row["title"],
-                    "desc": row["desc"],
-                }
-                for row in cur.execute("SELECT week, title, desc FROM change_plan ORDER BY id")
-            ],
-            "stakeholders": [
-                {
-                    "name": row["name"],
-                    "impact": row["impact"],
-                    "focus": row["focus"],
-                    "strategy": row["strategy"],
-                }
-                for row in cur.execute(
-                    "SELECT name, impact, focus, strategy FROM stakeholders ORDER BY id"
-                )
-            ],
-        }
 
-        return {"portfolio": portfolio, "governance": governance, "change_management": change_management}
+@app.get("/api/v1/portfolio")
+def get_portfolio_simulation():
+    """Portfolio, governance and change management payload
+
+    Built from six queries whatever the number of apps, and served from
+    memory until portfolio_version shows that one of the tables changed.
+    """
+    global _portfolio_cache, _portfolio_triggers_ready
+    with closing(get_connection()) as conn:
+        if not _portfolio_triggers_ready:
+            ensure_portfolio_version(conn)
+            _portfolio_triggers_ready = True
+
+        version = conn.execute("SELECT version FROM portfolio_version WHERE id = 1").fetchone()[0]
+        cached_version, body = _portfolio_cache
+        if cached_version != version:
+            # Read the version and the tables in one snapshot so a concurrent
+            # write cannot be cached under the older version
+            with conn:
+                conn.execute("BEGIN")
+                version = conn.execute("SELECT version FROM portfolio_version WHERE id = 1").fetchone()[0]
+                payload = build_portfolio(conn.cursor())
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            _portfolio_cache = (version, body)
+    return Response(content=body, media_type="application/json")
 
 
 # ==================== M&M Digital Maturity APIs ====================
@@ -504,6 +761,7 @@ class DimensionResponse(BaseModel):
 class AreaResponse(BaseModel):
     id: int
     name: str
+    plant_name: Optional[str] = None
     description: Optional[str]
     desired_level: Optional[int]
     dimensions: List[DimensionResponse]
@@ -511,6 +769,27 @@ class AreaResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class AreaChange(BaseModel):
+    id: int
+    name: str
+    plant_name: Optional[str] = None
+    description: Optional[str]
+    desired_level: Optional[int]
+    
+    class Config:
+        orm_mode = True
+
+class DimensionChange(DimensionResponse):
+    area_id: int
+
+class AreaChangesResponse(BaseModel):
+    cursor: int
+    reset: bool  # The cursor was not issued by this database; drop local state and apply as a full load
+    areas: List[AreaChange]
+    dimensions: List[DimensionChange]
+    deleted_areas: List[int]
+    deleted_dimensions: List[int]
+
 class MaturityLevelResponse(BaseModel):
     id: int
     level: int
@@ -548,6 +827,7 @@ class AssessmentResponse(BaseModel):
     assessment_date: datetime
     assessor_name: Optional[str] = None
     notes: Optional[str] = None
+    version: int = 0
     
     class Config:
         orm_mode = True
@@ -566,128 +846,528 @@ class ChecksheetSelectionResponse(BaseModel):
     evidence: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    version: int = 0
     
     class Config:
         orm_mode = True
 
+class SelectionChange(BaseModel):
+    maturity_level_id: int
+    is_selected: bool
+    evidence: Optional[str] = None
+
+class SelectionPatch(BaseModel):
+    version: int  # Assessment version the client's checksheet reflects
+    changes: List[SelectionChange]
+
 # API Endpoints
-@app.get("/api/mm/areas", response_model=List[AreaResponse])
-def get_areas(db: Session = Depends(get_db)):
-    """Get all manufacturing areas with their dimensions"""
-    areas = db.query(Area).all()
+def conditional_on(name: str):
+    """Route dependency answering conditional GETs from the ``name`` data version
+    
+    The version is read with one plain query before any session is used.
+    A request whose If-None-Match (or, failing that, If-Modified-Since)
+    still matches gets a 304 straight away; otherwise the ETag and
+    Last-Modified headers are added to the endpoint's response, and the
+    version is left on request.state for cached_json.
+    """
+    def dependency(request: Request, response: Response):
+        current = get_data_version(name)
+        if current is None:
+            return
+        request.state.data_version = current
+        version, updated_at = current
+        headers = {
+            "ETag": f'"{name}-{version}-{updated_at}"',
+            "Last-Modified": formatdate(updated_at, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            not_modified = "*" in tags or headers["ETag"] in tags
+        else:
+            try:
+                since = parsedate_to_datetime(request.headers.get("if-modified-since", ""))
+                not_modified = updated_at <= since.timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+        if not_modified:
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+    return Depends(dependency)
+
+def plant_areas(db: Session, plant: Optional[str]):
+    """Areas of an uploaded plant workbook, or of MM_Data.xlsx when plant is None.
+
+    Dimensions are loaded with the areas in one extra query rather than one
+    query per area, so callers stay within AREA_GRAPH_QUERIES.
+    """
+    return (
+        db.query(Area)
+        .filter(Area.plant_name.is_not_distinct_from(plant))
+        .options(selectinload(Area.dimensions))
+        .order_by(Area.id)
+    )
+
+# Areas plus their dimensions
+AREA_GRAPH_QUERIES = 2
+
+# Serialized reference data, rebuilt when its data version moves
+_reference_bodies = VersionedBodies()
+
+def cached_json(request: Request, response: Response, key, build):
+    """JSON response from the body cached for ``key`` at the version conditional_on read
+
+    ``build`` returns the payload as plain rows; it only runs when the cached
+    body is missing or stale. Headers the dependencies set on ``response``
+    are carried over.
+    """
+    version = getattr(request.state, "data_version", None)
+    content = _reference_bodies.get(key, version, build) if version is not None else build()
+    return json_response(request, content, headers=dict(response.headers))
+
+def reference_rows(db: Session, columns, order_by):
+    """Rows of ``columns`` as plain dicts, skipping the ORM and response models"""
+    return [dict(row) for row in db.execute(select(*columns).order_by(*order_by)).mappings()]
+
+# Largest page a list endpoint returns for ``limit``
+MAX_PAGE_SIZE = 1000
+
+# Response header carrying the ``after`` value for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Columns the list endpoints can return, in their response order
+MATURITY_LEVEL_FIELDS = ["id", "level", "name", "sub_level", "category", "description"]
+RATING_SCALE_FIELDS = ["id", "dimension_name", "level", "rating_name", "digital_maturity_description", "business_relevance"]
+CHECKSHEET_SELECTION_FIELDS = [
+    "id", "assessment_id", "maturity_level_id", "is_selected", "evidence", "created_at", "updated_at", "version"
+]
+
+def selected_fields(fields: Optional[str], allowed: List[str]):
+    """Field names from a comma-separated ``fields`` parameter, or all of ``allowed``"""
+    if fields is None:
+        return allowed
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}. Available: {', '.join(allowed)}"
+        )
+    return names
+
+def encode_cursor(values):
+    encoded = base64.urlsafe_b64encode(json.dumps(list(values), separators=(",", ":")).encode("utf-8"))
+    return encoded.decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, width: int):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii") + b"=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != width or not all(isinstance(v, (int, str)) for v in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def keyset_page(db: Session, model, fields: List[str], keys, limit: Optional[int], after: Optional[str]):
+    """One page of ``model`` rows holding only ``fields``, in ``keys`` order.
+
+    ``keys`` must be non-null and end with a unique column. Only the rows
+    after the ``after`` cursor are read, straight from the key order, so a
+    page costs the same however deep it is. Returns the rows as plain dicts
+    and the cursor for the next page, or None on the last one.
+    """
+    query = select(*[getattr(model, name) for name in fields], *keys).order_by(*keys)
+    if after is not None:
+        query = query.where(tuple_(*keys) > tuple_(*decode_cursor(after, len(keys))))
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = db.execute(query).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][len(fields):])
+    return [dict(zip(fields, row)) for row in rows], next_cursor
+
+def list_response(request: Request, response: Response, rows, next_cursor):
+    headers = dict(response.headers)
+    if next_cursor is not None:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return json_response(request, rows, headers=headers)
+
+def area_rows(db: Session, plant: Optional[str]):
+    """Areas of a plant with their dimensions as plain dicts, in AreaResponse's shape"""
+    in_plant = Area.plant_name.is_not_distinct_from(plant)
+    areas = [
+        dict(row)
+        for row in db.execute(
+            select(Area.id, Area.name, Area.plant_name, Area.description, Area.desired_level)
+            .where(in_plant)
+            .order_by(Area.id)
+        ).mappings()
+    ]
+    dimensions = {area["id"]: area.setdefault("dimensions", []) for area in areas}
+    rows = db.execute(
+        select(Dimension.area_id, Dimension.id, Dimension.name, Dimension.current_level,
+               Dimension.desired_level, Dimension.updated_at)
+        .where(Dimension.area_id.in_(select(Area.id).where(in_plant)))
+        .order_by(Dimension.id)
+    ).mappings()
+    for row in rows:
+        dimension = dict(row)
+        dimensions[dimension.pop("area_id")].append(dimension)
     return areas
 
-@app.post("/api/mm/refresh-reports-data")
-def refresh_reports_data(db: Session = Depends(get_db)):
+@app.get("/api/mm/areas", response_model=List[AreaResponse], dependencies=[conditional_on("areas")])
+def get_areas(request: Request, response: Response, plant: Optional[str] = None,
+              db: Session = Depends(get_read_db_within(AREA_GRAPH_QUERIES, "GET /api/mm/areas"))):
+    """Get all manufacturing areas with their dimensions"""
+    return cached_json(request, response, ("areas", plant), lambda: area_rows(db, plant))
+
+@app.post("/api/mm/refresh-reports-data", status_code=202)
+def refresh_reports_data(response: Response, force: bool = False, wait: Optional[bool] = None):
     """Refresh Reports data (Areas and Dimensions) from Excel file"""
-    try:
-        import os
-        import pandas as pd
-        import random
-        
-        # Build path to Excel file in backend directory
-        backend_dir = os.path.dirname(os.path.abspath(__file__))
-        excel_path = os.path.join(backend_dir, 'MM_Data.xlsx')
-        
-        if not os.path.exists(excel_path):
-            raise HTTPException(status_code=404, detail=f"Excel file not found at {excel_path}")
-        
-        # Clear existing areas and dimensions
-        db.query(Dimension).delete()
-        db.query(Area).delete()
-        db.commit()
-        
-        # Read the Reports sheet
-        df = pd.read_excel(excel_path, sheet_name='Reports', header=None)
-        
-        current_area = None
-        area_obj = None
-        dimension_count = 0
-        area_count = 0
-        
-        # Parse the data
-        for idx, row in df.iterrows():
-            if idx < 3:  # Skip header rows
-                continue
-            
-            area_name = str(row[0]) if pd.notna(row[0]) else ""
-            col1_value = str(row[1]) if pd.notna(row[1]) else ""
-            col8_value = row[8] if pd.notna(row[8]) else None
-            
-            # Check if this is an area header (has area name in column 0)
-            if area_name and area_name != "nan":
-                current_area = area_name
-                
-                # Get desired level from the first row of the area
-                if col8_value and str(col8_value) != "nan":
-                    try:
-                        desired_level = int(float(col8_value))
-                    except:
-                        desired_level = 3
-                else:
-                    desired_level = 3
-                
-                # Create Area
-                area_obj = Area(
-                    name=current_area,
-                    description=f"{current_area} Digital Maturity Assessment",
-                    desired_level=desired_level
-                )
-                db.add(area_obj)
-                db.flush()
-                area_count += 1
-                
-                # Also add the first dimension from this row
-                if col1_value and col1_value != "nan" and col1_value != "Dimension":
-                    dimension_name = col1_value
-                    current_level = random.randint(max(1, desired_level - 2), min(desired_level + 1, 5))
-                    
-                    dimension = Dimension(
-                        name=dimension_name,
-                        area_id=area_obj.id,
-                        current_level=current_level,
-                        desired_level=desired_level
-                    )
-                    db.add(dimension)
-                    dimension_count += 1
-                continue
-            
-            # Check if this is a dimension row
-            dimension_name = str(row[1]) if pd.notna(row[1]) else ""
-            
-            if area_obj and dimension_name and dimension_name != "nan" and dimension_name != "Dimension":
-                # Assign current level (simulated with randomization)
-                current_level = random.randint(max(1, area_obj.desired_level - 2), min(area_obj.desired_level + 1, 5))
-                
-                dimension = Dimension(
-                    name=dimension_name,
-                    area_id=area_obj.id,
-                    current_level=current_level,
-                    desired_level=area_obj.desired_level
-                )
-                db.add(dimension)
-                dimension_count += 1
-        
-        db.commit()
-        return {
-            "status": "success",
-            "message": f"Successfully loaded {area_count} areas with {dimension_count} dimensions",
-            "area_count": area_count,
-            "dimension_count": dimension_count
-        }
-        
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error refreshing reports data: {str(e)}")
+    excel_path = get_excel_path()
+    return _submit_refresh(
+        "refresh-reports-data", excel_path, force, response, wait,
+        lambda job: _refresh_sheet(job, excel_path, REPORTS_SHEET, "Error refreshing reports data", force)
+    )
+
+# Declared before /api/mm/areas/{area_id} so "changes" is not taken for an id
+@app.get("/api/mm/areas/changes", response_model=AreaChangesResponse)
+def get_area_changes(since: int = Query(0, ge=0), plant: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """Areas and dimensions changed since a cursor, plus tombstones for deleted ones
+    
+    Start with since=0 for a full load and pass back the returned cursor on
+    the next call. Rows come back with their current values; a row changed
+    again while this runs may show up in the next delta as well.
+    """
+    # Bound the delta by the newest seq first so nothing committed meanwhile is skipped
+    cursor = db.query(func.max(RowChange.seq)).scalar() or 0
+    reset = since > cursor
+    if reset:
+        since = 0
+    
+    window = (
+        RowChange.seq > since,
+        RowChange.seq <= cursor,
+        RowChange.plant_name.is_not_distinct_from(plant),
+    )
+    areas = (
+        db.query(Area)
+        .join(RowChange, (RowChange.table_name == "areas") & (RowChange.row_id == Area.id))
+        .filter(*window, RowChange.deleted == False)
+        .order_by(RowChange.seq)
+        .all()
+    )
+    dimensions = (
+        db.query(Dimension)
+        .join(RowChange, (RowChange.table_name == "dimensions") & (RowChange.row_id == Dimension.id))
+        .filter(*window, RowChange.deleted == False)
+        .order_by(RowChange.seq)
+        .all()
+    )
+    deleted = db.query(RowChange.table_name, RowChange.row_id).filter(*window, RowChange.deleted == True).all()
+    
+    return {
+        "cursor": cursor,
+        "reset": reset,
+        "areas": areas,
+        "dimensions": dimensions,
+        "deleted_areas": [row_id for table_name, row_id in deleted if table_name == "areas"],
+        "deleted_dimensions": [row_id for table_name, row_id in deleted if table_name == "dimensions"],
+    }
 
 @app.get("/api/mm/areas/{area_id}", response_model=AreaResponse)
-def get_area(area_id: int, db: Session = Depends(get_db)):
+def get_area(area_id: int, db: Session = Depends(get_read_db)):
     """Get specific area with dimensions"""
-    area = db.query(Area).filter(Area.id == area_id).first()
+    area = db.query(Area).options(selectinload(Area.dimensions)).filter(Area.id == area_id).first()
     if not area:
         raise HTTPException(status_code=404, detail="Area not found")
     return area
 
+# Trends default to the last 30 days
+DEFAULT_TREND_SECONDS = 30 * 86400
+
+def trend_range(start: Optional[datetime], end: Optional[datetime]):
+    """Epoch-second bounds of a trend request; naive datetimes are UTC"""
+    def epoch(value):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    
+    end_ts = epoch(end) if end else int(datetime.now(timezone.utc).timestamp())
+    start_ts = epoch(start) if start else end_ts - DEFAULT_TREND_SECONDS
+    if start_ts >= end_ts:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start_ts, end_ts
+
+def trend_payload(timestamps, resolution):
+    return {
+        "start": timestamps[0],
+        "bucket_seconds": timestamps[1] - timestamps[0] if len(timestamps) > 1 else None,
+        "source": RESOLUTION_NAMES[resolution],
+        "timestamps": timestamps,
+    }
+
+@app.get("/api/mm/areas/{area_id}/trend")
+def get_area_trend(area_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   points: int = Query(100, ge=1, le=MAX_TREND_POINTS), db: Session = Depends(get_read_db)):
+    """Average current level of an area and each of its dimensions over time
+    
+    The range is split into ``points`` equal buckets, each holding the
+    time-weighted average level over that bucket (null where no level was
+    recorded yet). Timestamps are bucket starts in epoch seconds.
+    """
+    area = db.query(Area).options(selectinload(Area.dimensions)).filter(Area.id == area_id).first()
+    if not area:
+        raise HTTPException(status_code=404, detail="Area not found")
+    
+    start_ts, end_ts = trend_range(start, end)
+    timestamps, resolution, levels = level_trend(
+        db, {dimension.id: area.id for dimension in area.dimensions}, start_ts, end_ts, points
+    )
+    return {
+        "area_id": area.id,
+        "area_name": area.name,
+        **trend_payload(timestamps, resolution),
+        "average": average_series(levels.values(), points),
+        "dimensions": [
+            {"id": dimension.id, "name": dimension.name, "levels": levels[dimension.id]}
+            for dimension in area.dimensions
+        ],
+    }
+
+@app.get("/api/mm/trend")
+def get_plant_trend(plant: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    points: int = Query(100, ge=1, le=MAX_TREND_POINTS), db: Session = Depends(get_read_db)):
+    """Plant-wide trend: average current level of each area and of all dimensions over time"""
+    areas = plant_areas(db, plant).all()
+    start_ts, end_ts = trend_range(start, end)
+    timestamps, resolution, levels = level_trend(
+        db, {dimension.id: area.id for area in areas for dimension in area.dimensions}, start_ts, end_ts, points
+    )
+    return {
+        "plant": plant,
+        **trend_payload(timestamps, resolution),
+        "average": average_series(levels.values(), points),
+        "areas": [
+            {
+                "id": area.id,
+                "name": area.name,
+                "levels": average_series((levels[dimension.id] for dimension in area.dimensions), points),
+            }
+            for area in areas
+        ],
+    }
+
+# Change stream settings. Commits in this process wake the feed at once; the
+# poll interval bounds the delay for writes made by other worker processes.
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get('MM_STREAM_HEARTBEAT_SECONDS', '15'))
+STREAM_POLL_SECONDS = float(os.environ.get('MM_STREAM_POLL_SECONDS', '2'))
+
+STREAM_PAGE_SIZE = 500
+# Changes a stream may fall behind by before it is closed; the client then
+# reconnects with Last-Event-ID and catches up from the database
+STREAM_QUEUE_SIZE = 1000
+
+def _latest_change_ids():
+    """Newest history id and newest row_changes seq"""
+    db = ReadSessionLocal()
+    try:
+        return latest_change_id(db), db.query(func.max(RowChange.seq)).scalar() or 0
+    finally:
+        db.close()
+
+def _read_changes(after_id: int, area_ids: Optional[List[int]] = None, up_to: Optional[int] = None):
+    """Changes after ``after_id`` and the id the next read should start after
+    
+    Changes are bounded by ``up_to``, or else by the newest id, read first.
+    Writers are serialized, so every row up to that id is already committed
+    and the reader can move past rows the area filter skipped.
+    """
+    db = ReadSessionLocal()
+    try:
+        if up_to is None:
+            up_to = latest_change_id(db)
+        changes = changes_since(db, after_id, area_ids, STREAM_PAGE_SIZE, up_to=up_to)
+        if len(changes) == STREAM_PAGE_SIZE:
+            return changes, changes[-1]["id"]
+        return changes, max(after_id, up_to)
+    finally:
+        db.close()
+
+def _read_deletions(after_seq: int):
+    """Area and dimension tombstones after ``after_seq`` and the seq the next read should start after"""
+    db = ReadSessionLocal()
+    try:
+        up_to = db.query(func.max(RowChange.seq)).scalar() or 0
+        rows = (
+            db.query(RowChange)
+            .filter(RowChange.seq > after_seq, RowChange.seq <= up_to, RowChange.deleted == True)
+            .order_by(RowChange.seq)
+            .limit(STREAM_PAGE_SIZE)
+            .all()
+        )
+        deletions = [
+            {"seq": row.seq, "table": row.table_name, "row_id": row.row_id,
+             "area_id": row.area_id, "plant_name": row.plant_name}
+            for row in rows
+        ]
+        if len(deletions) == STREAM_PAGE_SIZE:
+            return deletions, deletions[-1]["seq"]
+        return deletions, max(after_seq, up_to)
+    finally:
+        db.close()
+
+class StreamSubscription:
+    def __init__(self, area_ids: Optional[List[int]]):
+        self.area_ids = set(area_ids) if area_ids else None
+        self.queue = asyncio.Queue(STREAM_QUEUE_SIZE)
+        self.overflowed = False
+
+class ChangeFeed:
+    """Reads new level changes once per process and fans them out to every stream
+    
+    A single task, running only while a stream is open, reads the history
+    rows after the last id it has seen, and the area and dimension
+    tombstones after the last row_changes seq, whenever a commit wakes it or
+    STREAM_POLL_SECONDS pass. Each is put on the queue of every subscription
+    whose area filter it matches as an (event, data) pair.
+    """
+    def __init__(self):
+        self.subscriptions = set()
+        self.after_id = None  # Newest id handed to subscriptions
+        self.after_seq = None  # Newest row_changes seq checked for deletions
+        self._task = None
+        self._ready = None
+        self._wake = None
+    
+    async def subscribe(self, area_ids: Optional[List[int]]):
+        """A subscription receiving every change after the feed's current ``after_id``"""
+        subscription = StreamSubscription(area_ids)
+        self.subscriptions.add(subscription)
+        if self._task is None:
+            self._ready = asyncio.Event()
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        await self._ready.wait()
+        return subscription
+    
+    def unsubscribe(self, subscription: StreamSubscription):
+        self.subscriptions.discard(subscription)
+    
+    def _publish(self, event, changes):
+        for subscription in list(self.subscriptions):
+            for change in changes:
+                if subscription.area_ids is not None and change["area_id"] not in subscription.area_ids:
+                    continue
+                try:
+                    subscription.queue.put_nowait((event, change))
+                except asyncio.QueueFull:
+                    subscription.overflowed = True
+                    self.subscriptions.discard(subscription)
+                    break
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        def notify():
+            loop.call_soon_threadsafe(self._wake.set)
+        
+        add_commit_listener(notify)
+        try:
+            while self.subscriptions:
+                self._wake.clear()
+                changes, deletions = [], []
+                try:
+                    if self.after_id is None:
+                        self.after_id, self.after_seq = await run_in_threadpool(_latest_change_ids)
+                        self._ready.set()
+                    else:
+                        changes, self.after_id = await run_in_threadpool(_read_changes, self.after_id)
+                        deletions, self.after_seq = await run_in_threadpool(_read_deletions, self.after_seq)
+                except Exception as e:
+                    print(f"⚠️ Change stream read failed: {e}")
+                self._publish("dimension", changes)
+                self._publish("deleted", deletions)
+                if STREAM_PAGE_SIZE in (len(changes), len(deletions)):
+                    continue  # More may be waiting behind a full page
+                try:
+                    await asyncio.wait_for(self._wake.wait(), STREAM_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            remove_commit_listener(notify)
+            self._task = None
+            self.after_id = None
+            self.after_seq = None
+
+change_feed = ChangeFeed()
+
+@app.get("/api/mm/stream")
+async def stream_changes(request: Request, area: Optional[List[int]] = Query(None),
+                         last_event_id: Optional[int] = None):
+    """Server-sent events: one ``dimension`` event per level change as it is committed
+    
+    ``area`` (repeatable) limits the stream to those areas. Event ids are
+    history ids; a reconnecting EventSource sends the last one it saw as
+    Last-Event-ID (or pass ``last_event_id``) and the stream resumes after
+    it. Without either, only changes from now on are sent. A comment line
+    is sent as a heartbeat when the stream has been idle.
+    
+    A ``deleted`` event (table, row_id, area_id, plant_name) is sent when an
+    area or dimension is deleted. These carry no id and are not replayed
+    after a reconnect, so a client that reconnects should reload its areas.
+    
+    Streams do not query the database themselves, apart from catching up
+    after a reconnect; the shared ChangeFeed reads new changes for all.
+    """
+    resume_from = request.headers.get("last-event-id")
+    after_id = int(resume_from) if resume_from and resume_from.isdigit() else last_event_id
+    
+    loop = asyncio.get_running_loop()
+    
+    async def events():
+        subscription = await change_feed.subscribe(area)
+        try:
+            # The subscription gets every change after this id
+            position = change_feed.after_id
+            last_id = position if after_id is None else after_id
+            # Tell EventSource how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+            while last_id < position:
+                changes, last_id = await run_in_threadpool(_read_changes, last_id, area, position)
+                for change in changes:
+                    yield f"id: {change['id']}\nevent: dimension\ndata: {json.dumps(change)}\n\n"
+            
+            idle_since = loop.time()
+            while not subscription.overflowed and not await request.is_disconnected():
+                try:
+                    event, change = await asyncio.wait_for(subscription.queue.get(), STREAM_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    if loop.time() - idle_since >= STREAM_HEARTBEAT_SECONDS:
+                        yield ": heartbeat\n\n"
+                        idle_since = loop.time()
+                    continue
+                if event == "deleted":
+                    yield f"event: deleted\ndata: {json.dumps(change)}\n\n"
+                    idle_since = loop.time()
+                    continue
+                if change["id"] <= last_id:
+                    continue  # Already sent while catching up
+                last_id = change["id"]
+                yield f"id: {change['id']}\nevent: dimension\ndata: {json.dumps(change)}\n\n"
+                idle_since = loop.time()
+        finally:
+            change_feed.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.put("/api/mm/dimensions/{dimension_id}")
 def update_dimension(dimension_id: int, update: DimensionUpdate, db: Session = Depends(get_db)):
     """Update dimension current/desired level"""
@@ -695,20 +1375,37 @@ def update_dimension(dimension_id: int, update: DimensionUpdate, db: Session = D
     if not dimension:
         raise HTTPException(status_code=404, detail="Dimension not found")
     
+    levels = (dimension.current_level, dimension.desired_level)
     dimension.current_level = update.current_level
     if update.desired_level is not None:
         dimension.desired_level = update.desired_level
     dimension.updated_at = datetime.utcnow()
     
+    if (dimension.current_level, dimension.desired_level) != levels:
+        record_levels(
+            db, [(dimension.id, dimension.area_id, dimension.current_level, dimension.desired_level)], SOURCE_EDIT
+        )
     db.commit()
     db.refresh(dimension)
     return {"status": "success", "dimension": dimension}
 
-@app.get("/api/mm/maturity-levels", response_model=List[MaturityLevelResponse])
-def get_maturity_levels(db: Session = Depends(get_db)):
-    """Get all maturity level definitions"""
-    levels = db.query(MaturityLevel).order_by(MaturityLevel.level, MaturityLevel.sub_level).all()
-    return levels
+@app.get("/api/mm/maturity-levels", response_model=List[MaturityLevelResponse], dependencies=[conditional_on("maturity_levels")])
+def get_maturity_levels(request: Request, response: Response, fields: Optional[str] = None,
+                        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None,
+                        db: Session = Depends(get_read_db)):
+    """Get all maturity level definitions
+    
+    ``fields`` (comma-separated) returns only those columns; ``limit`` and
+    ``after`` page through the levels, with the next ``after`` in the
+    X-Next-Cursor header until the last page.
+    """
+    names = selected_fields(fields, MATURITY_LEVEL_FIELDS)
+    if fields is None and limit is None and after is None:
+        return cached_json(request, response, "maturity_levels", lambda: reference_rows(
+            db, [getattr(MaturityLevel, name) for name in names], [MaturityLevel.level, MaturityLevel.sub_level]
+        ))
+    keys = [MaturityLevel.level, func.coalesce(MaturityLevel.sub_level, ""), MaturityLevel.id]
+    return list_response(request, response, *keyset_page(db, MaturityLevel, names, keys, limit, after))
 
 @app.post("/api/mm/assessments", response_model=AssessmentResponse)
 def create_assessment(assessment: AssessmentCreate, db: Session = Depends(get_db)):
@@ -731,125 +1428,202 @@ def create_assessment(assessment: AssessmentCreate, db: Session = Depends(get_db
     return new_assessment
 
 @app.get("/api/mm/assessments/{assessment_id}", response_model=AssessmentResponse)
-def get_assessment(assessment_id: int, db: Session = Depends(get_db)):
+def get_assessment(assessment_id: int, db: Session = Depends(get_read_db)):
     """Get assessment by ID"""
     assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     return assessment
 
+def upsert_selections(db: Session, selections: List[ChecksheetSelectionCreate], versions: Dict[int, int]):
+    """Insert or update ``selections`` with one INSERT ... ON CONFLICT statement
+    
+    Rows are matched on the (assessment_id, maturity_level_id) unique index;
+    a later item for the same pair wins. Existing rows whose is_selected and
+    evidence already match are left alone. Written rows are stamped with
+    their assessment's entry in ``versions``. Nothing is committed.
+    Returns (inserted, updated, unchanged) counts.
+    
+    Selections without an assessment_id can't use the unique index (NULLs
+    never conflict), so they are matched on maturity_level_id among the
+    rows that have no assessment either, as they always were.
+    """
+    now = datetime.utcnow()
+    inserted, updated, unchanged = upsert_unassigned_selections(
+        db, [selection for selection in selections if selection.assessment_id is None], now
+    )
+    selections = [selection for selection in selections if selection.assessment_id is not None]
+    rows = {
+        (selection.assessment_id, selection.maturity_level_id): {
+            "assessment_id": selection.assessment_id,
+            "maturity_level_id": selection.maturity_level_id,
+            "is_selected": selection.is_selected,
+            "evidence": selection.evidence,
+            "created_at": now,
+            "updated_at": now,
+            "version": versions.get(selection.assessment_id, 0),
+        }
+        for selection in selections
+    }
+    if not rows:
+        return inserted, updated, unchanged
+    
+    table = ChecksheetSelection.__table__
+    statement = sqlite_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=["assessment_id", "maturity_level_id"],
+        set_={
+            "is_selected": statement.excluded.is_selected,
+            "evidence": statement.excluded.evidence,
+            "updated_at": statement.excluded.updated_at,
+            "version": statement.excluded.version,
+        },
+        where=(
+            table.c.is_selected.is_distinct_from(statement.excluded.is_selected)
+            | table.c.evidence.is_distinct_from(statement.excluded.evidence)
+        )
+    )
+    # Updates keep the row's original created_at, so only new rows come back with ours
+    written = db.execute(statement.returning(table.c.created_at), list(rows.values())).scalars().all()
+    new_rows = sum(created_at == now for created_at in written)
+    return (
+        inserted + new_rows,
+        updated + len(written) - new_rows,
+        unchanged + len(rows) - len(written),
+    )
+
+def upsert_unassigned_selections(db: Session, selections: List[ChecksheetSelectionCreate], now: datetime):
+    """Insert or update selections that have no assessment_id, one maturity level at a time
+    
+    Returns (inserted, updated, unchanged) counts. Nothing is committed.
+    """
+    table = ChecksheetSelection.__table__
+    latest = {selection.maturity_level_id: selection for selection in selections}
+    inserted = updated = unchanged = 0
+    for maturity_level_id, selection in latest.items():
+        existing = db.execute(
+            select(table.c.id, table.c.is_selected, table.c.evidence)
+            .where(table.c.assessment_id.is_(None), table.c.maturity_level_id == maturity_level_id)
+        ).first()
+        if existing is None:
+            db.execute(sqlite_insert(table).values(
+                maturity_level_id=maturity_level_id,
+                is_selected=selection.is_selected,
+                evidence=selection.evidence,
+                created_at=now,
+                updated_at=now,
+            ))
+            inserted += 1
+        elif (existing.is_selected, existing.evidence) == (selection.is_selected, selection.evidence):
+            unchanged += 1
+        else:
+            db.execute(update(table).where(table.c.id == existing.id).values(
+                is_selected=selection.is_selected,
+                evidence=selection.evidence,
+                updated_at=now,
+            ))
+            updated += 1
+    return inserted, updated, unchanged
+
+def bump_assessment_versions(db: Session, assessment_ids, expected_version: Optional[int] = None):
+    """Increment the version of each assessment, or only of those at ``expected_version``
+    
+    Returns {assessment_id: new version} for the assessments bumped.
+    """
+    table = Assessment.__table__
+    statement = update(table).where(table.c.id.in_(assessment_ids))
+    if expected_version is not None:
+        statement = statement.where(table.c.version == expected_version)
+    statement = statement.values(version=table.c.version + 1).returning(table.c.id, table.c.version)
+    return dict(db.execute(statement).all())
+
 @app.post("/api/mm/checksheet-selections")
 def save_checksheet_selections(selections: List[ChecksheetSelectionCreate], db: Session = Depends(get_db)):
-    """Save multiple checksheet selections"""
+    """Save multiple checksheet selections
+    
+    The batch is written with a single upsert; selections that are already
+    stored with the same values are counted as unchanged and not rewritten.
+    Selections without an assessment_id are still accepted; there is no
+    assessment version to bump for them.
+    """
     try:
-        saved_count = 0
-        for selection_data in selections:
-            # Check if selection already exists
-            existing = db.query(ChecksheetSelection).filter(
-                ChecksheetSelection.assessment_id == selection_data.assessment_id,
-                ChecksheetSelection.maturity_level_id == selection_data.maturity_level_id
-            ).first()
-            
-            if existing:
-                # Update existing selection
-                existing.is_selected = selection_data.is_selected
-                existing.evidence = selection_data.evidence
-                existing.updated_at = datetime.utcnow()
-            else:
-                # Create new selection
-                new_selection = ChecksheetSelection(
-                    assessment_id=selection_data.assessment_id,
-                    maturity_level_id=selection_data.maturity_level_id,
-                    is_selected=selection_data.is_selected,
-                    evidence=selection_data.evidence
-                )
-                db.add(new_selection)
-            saved_count += 1
-        
-        db.commit()
+        versions = bump_assessment_versions(
+            db, {selection.assessment_id for selection in selections if selection.assessment_id is not None}
+        )
+        inserted, updated, unchanged = upsert_selections(db, selections, versions)
+        if inserted or updated:
+            db.commit()
+        else:
+            db.rollback()  # Leave the versions alone when nothing changed
+        saved_count = len(selections)
         return {
             "status": "success",
             "message": f"Saved {saved_count} selections",
-            "count": saved_count
+            "count": saved_count,
+            "inserted": inserted,
+            "updated": updated,
+            "unchanged": unchanged
         }
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error saving selections: {str(e)}")
 
-@app.get("/api/mm/checksheet-selections/{assessment_id}", response_model=List[ChecksheetSelectionResponse])
-def get_checksheet_selections(assessment_id: int, db: Session = Depends(get_db)):
-    """Get all checksheet selections for an assessment"""
-    selections = db.query(ChecksheetSelection).filter(
-        ChecksheetSelection.assessment_id == assessment_id
-    ).all()
-    return selections
-
-@app.get("/api/mm/checksheet-selections")
-def get_all_checksheet_selections(db: Session = Depends(get_db)):
-    """Get all checksheet selections (for demo/testing)"""
-    selections = db.query(ChecksheetSelection).all()
-    return selections
+@app.patch("/api/mm/assessments/{assessment_id}/selections")
+def patch_assessment_selections(assessment_id: int, patch: SelectionPatch, db: Session = Depends(get_db)):
+    """Apply only the checksheet items that changed, if the client is up to date
+    
+    ``version`` is the assessment version the client last saw. The version
+    is checked and bumped in the same statement, so of two assessors
+    sending the same version only the first is applied. A stale client
+    gets a 409 whose detail holds the current version and every selection
+    changed after the client's version; it should merge those and send
+    its changes again with the new version.
+    """
+    versions = bump_assessment_versions(db, [assessment_id], expected_version=patch.version)
+    if not versions:
+        db.rollback()
+        current = db.query(Assessment.version).filter(Assessment.id == assessment_id).scalar()
+        if current is None:
+            raise HTTPException(status_code=404, detail="Assessment not found")
+        changed = db.execute(
+            select(*[getattr(ChecksheetSelection, name) for name in CHECKSHEET_SELECTION_FIELDS])
+            .where(
+                ChecksheetSelection.assessment_id == assessment_id,
+                ChecksheetSelection.version > patch.version,
+                ChecksheetSelection.version <= current,
+            )
+            .order_by(ChecksheetSelection.version, ChecksheetSelection.id)
+        ).mappings()
+        raise HTTPException(status_code=409, detail={
+            "message": f"Assessment is at version {current}, not {patch.version}",
+            "version": current,
+            "changes": jsonable_encoder([dict(row) for row in changed]),
+        })
     
-    new_assessment = Assessment(
-        area_id=first_area.id,
-        plant_name=assessment.plant_name,
-        assessor_name=assessment.assessor_name,
-        notes=assessment.notes,
-        assessment_date=datetime.utcnow()
-    )
-    db.add(new_assessment)
-    db.commit()
-    db.refresh(new_assessment)
-    return new_assessment
-
-@app.get("/api/mm/assessments/{assessment_id}", response_model=AssessmentResponse)
-def get_assessment(assessment_id: int, db: Session = Depends(get_db)):
-    """Get assessment by ID"""
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
-    if not assessment:
-        raise HTTPException(status_code=404, detail="Assessment not found")
-    return assessment
-
-@app.post("/api/mm/checksheet-selections")
-def save_checksheet_selections(selections: List[ChecksheetSelectionCreate], db: Session = Depends(get_db)):
-    """Save multiple checksheet selections"""
     try:
-        saved_count = 0
-        for selection_data in selections:
-            # Check if selection already exists
-            existing = db.query(ChecksheetSelection).filter(
-                ChecksheetSelection.assessment_id == selection_data.assessment_id,
-                ChecksheetSelection.maturity_level_id == selection_data.maturity_level_id
-            ).first()
-            
-            if existing:
-                # Update existing selection
-                existing.is_selected = selection_data.is_selected
-                existing.evidence = selection_data.evidence
-                existing.updated_at = datetime.utcnow()
-            else:
-                # Create new selection
-                new_selection = ChecksheetSelection(
-                    assessment_id=selection_data.assessment_id,
-                    maturity_level_id=selection_data.maturity_level_id,
-                    is_selected=selection_data.is_selected,
-                    evidence=selection_data.evidence
-                )
-                db.add(new_selection)
-            saved_count += 1
-        
-        db.commit()
+        selections = [
+            ChecksheetSelectionCreate(assessment_id=assessment_id, **change.dict()) for change in patch.changes
+        ]
+        inserted, updated, unchanged = upsert_selections(db, selections, versions)
+        if inserted or updated:
+            db.commit()
+            version = versions[assessment_id]
+        else:
+            db.rollback()
+            version = patch.version
         return {
             "status": "success",
-            "message": f"Saved {saved_count} selections",
-            "count": saved_count
+            "version": version,
+            "inserted": inserted,
+            "updated": updated,
+            "unchanged": unchanged
         }
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error saving selections: {str(e)}")
 
 @app.get("/api/mm/checksheet-selections/{assessment_id}", response_model=List[ChecksheetSelectionResponse])
-def get_checksheet_selections(assessment_id: int, db: Session = Depends(get_db)):
+def get_checksheet_selections(assessment_id: int, db: Session = Depends(get_read_db)):
     """Get all checksheet selections for an assessment"""
     selections = db.query(ChecksheetSelection).filter(
         ChecksheetSelection.assessment_id == assessment_id
@@ -857,10 +1631,17 @@ def get_checksheet_selections(assessment_id: int, db: Session = Depends(get_db))
     return selections
 
 @app.get("/api/mm/checksheet-selections")
-def get_all_checksheet_selections(db: Session = Depends(get_db)):
-    """Get all checksheet selections (for demo/testing)"""
-    selections = db.query(ChecksheetSelection).all()
-    return selections
+def get_all_checksheet_selections(request: Request, response: Response, fields: Optional[str] = None,
+                                  limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                                  after: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """Get all checksheet selections (for demo/testing)
+    
+    Takes ``fields``, ``limit`` and ``after`` like /api/mm/maturity-levels;
+    pages run in id order.
+    """
+    names = selected_fields(fields, CHECKSHEET_SELECTION_FIELDS)
+    rows, next_cursor = keyset_page(db, ChecksheetSelection, names, [ChecksheetSelection.id], limit, after)
+    return list_response(request, response, rows, next_cursor)
 
 @app.post("/api/mm/calculate-dimension-scores")
 def calculate_dimension_scores(assessment_id: int, db: Session = Depends(get_db)):
@@ -905,14 +1686,15 @@ def calculate_dimension_scores(assessment_id: int, db: Session = Depends(get_db)
         # Update all dimensions with the calculated score
         calculated_level = dimension_scores.get('level_score', 1)
         dimensions = db.query(Dimension).all()
-        updated_count = 0
+        changed = []
         
         for dimension in dimensions:
             # Only update if calculated level is different
             if dimension.current_level != calculated_level:
                 dimension.current_level = calculated_level
                 dimension.updated_at = datetime.utcnow()
-                updated_count += 1
+                changed.append((dimension.id, dimension.area_id, calculated_level, dimension.desired_level))
+        updated_count = record_levels(db, changed, SOURCE_SCORING)
         
         db.commit()
         
@@ -928,178 +1710,27 @@ def calculate_dimension_scores(assessment_id: int, db: Session = Depends(get_db)
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error calculating scores: {str(e)}")
 
-@app.post("/api/mm/refresh-simulated-data")
-def refresh_simulated_data(db: Session = Depends(get_db)):
+@app.post("/api/mm/refresh-simulated-data", status_code=202)
+def refresh_simulated_data(response: Response, force: bool = False, wait: Optional[bool] = None):
     """Refresh all simulated data from Excel file"""
-    try:
-        import os
-        import pandas as pd
-        
-        # Build path to Excel file in backend directory
-        backend_dir = os.path.dirname(os.path.abspath(__file__))
-        excel_path = os.path.join(backend_dir, 'MM_Data.xlsx')
-        
-        if not os.path.exists(excel_path):
-            raise HTTPException(status_code=404, detail=f"Excel file not found at {excel_path}")
-        
-        # Clear existing maturity levels
-        db.query(MaturityLevel).delete()
-        db.commit()
-        
-        # Read the Excel sheet
-        df = pd.read_excel(excel_path, sheet_name='Smart Factory CheckSheet', header=None)
-        
-        current_level = None
-        current_level_name = None
-        loaded_count = 0
-        
-        for idx, row in df.iterrows():
-            if idx < 3:  # Skip header rows
-                continue
-            
-            # Check if this is a level header
-            first_col = str(row[1]) if pd.notna(row[1]) else ""
-            
-            if "Level" in first_col and ":" in first_col:
-                parts = first_col.split(":")
-                level_part = parts[0].strip()
-                level_num = int(level_part.replace("Level", "").strip())
-                level_name = parts[1].strip() if len(parts) > 1 else f"Level {level_num}"
-                
-                current_level = level_num
-                current_level_name = level_name
-                continue
-            
-            # Check for capability description
-            sub_level_col = str(row[0]) if pd.notna(row[0]) else ""
-            description_col = str(row[1]) if pd.notna(row[1]) else ""
-            
-            if description_col == "SUV" or description_col == "nan" or not description_col:
-                continue
-            
-            if sub_level_col and sub_level_col != "nan":
-                sub_level = sub_level_col
-                description = description_col
-                
-                # Determine category from dimension columns
-                category = None
-                dimension_map = {
-                    2: "Asset connectivity & OEE",
-                    3: "MES & system integration",
-                    4: "Traceability & quality",
-                    5: "Maintenance & reliability",
-                    6: "Logistics & supply chain",
-                    7: "Workforce & UX",
-                    8: "Sustainability & energy",
-                    9: "Multi-plant orchestration"
-                }
-                
-                for col_idx in range(2, 11):
-                    if pd.notna(row[col_idx]) and str(row[col_idx]).strip():
-                        category = dimension_map.get(col_idx, "General")
-                        break
-                
-                if current_level and description:
-                    maturity_level = MaturityLevel(
-                        level=current_level,
-                        name=current_level_name or f"Level {current_level}",
-                        sub_level=sub_level,
-                        category=category,
-                        description=description.strip()
-                    )
-                    db.add(maturity_level)
-                    loaded_count += 1
-        
-        db.commit()
-        return {
-            "status": "success",
-            "message": f"Successfully loaded {loaded_count} maturity level items",
-            "count": loaded_count
-        }
-        
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error refreshing data: {str(e)}")
+    excel_path = get_excel_path()
+    return _submit_refresh(
+        "refresh-simulated-data", excel_path, force, response, wait,
+        lambda job: _refresh_sheet(job, excel_path, CHECKSHEET_SHEET, "Error refreshing data", force)
+    )
 
-@app.post("/api/mm/refresh-rating-scales")
-def refresh_rating_scales(db: Session = Depends(get_db)):
+@app.post("/api/mm/refresh-rating-scales", status_code=202)
+def refresh_rating_scales(response: Response, force: bool = False, wait: Optional[bool] = None):
     """Refresh Rating Scales data from Excel file"""
-    try:
-        import os
-        import pandas as pd
-        
-        # Build path to Excel file in backend directory
-        backend_dir = os.path.dirname(os.path.abspath(__file__))
-        excel_path = os.path.join(backend_dir, 'MM_Data.xlsx')
-        
-        if not os.path.exists(excel_path):
-            raise HTTPException(status_code=404, detail=f"Excel file not found at {excel_path}")
-        
-        # Read the Rating Scales Excel sheet (without headers)
-        df = pd.read_excel(excel_path, sheet_name='Rating Scales', header=None)
-        
-        # Clear existing rating scales
-        db.query(RatingScale).delete()
-        db.commit()
-        
-        # Dimension names are in row 5 (index 5)
-        # Extract dimension names from row 5
-        dimension_row = df.iloc[5]
-        dimensions = []
-        for col_idx in [0, 3, 6, 9, 12, 15, 18, 21, 24, 27]:
-            if col_idx < len(dimension_row):
-                dim_name = dimension_row.iloc[col_idx]
-                if pd.notna(dim_name) and str(dim_name).strip() and 'Digital Maturity' not in str(dim_name):
-                    dimensions.append((col_idx, str(dim_name).strip()))
-        
-        loaded_count = 0
-        
-        # Extract data for levels 1-5 (rows 9-13)
-        for col_idx, dimension_name in dimensions:
-            for level_row_idx in range(9, 14):  # Rows 9-13 for levels 1-5
-                level = level_row_idx - 8  # Convert to level 1-5
-                
-                # Get the rating name and description
-                rating_cell = df.iloc[level_row_idx, col_idx]
-                description_cell = df.iloc[level_row_idx, col_idx + 1] if col_idx + 1 < len(df.columns) else None
-                
-                # Business relevance is in rows 18-20 (for levels 1-3 only)
-                business_relevance = None
-                if level <= 3:
-                    business_row_idx = 17 + level  # 18, 19, 20 for levels 1, 2, 3
-                    if business_row_idx < len(df):
-                        business_cell = df.iloc[business_row_idx, col_idx + 1]
-                        if pd.notna(business_cell):
-                            business_relevance = str(business_cell).strip()
-                
-                if pd.notna(rating_cell):
-                    rating_name = str(rating_cell).strip()
-                    rating_desc = str(description_cell).strip() if pd.notna(description_cell) else ""
-                    
-                    rating_scale = RatingScale(
-                        dimension_name=dimension_name,
-                        level=level,
-                        rating_name=rating_name[:200] if len(rating_name) > 200 else rating_name,
-                        digital_maturity_description=rating_desc,
-                        business_relevance=business_relevance
-                    )
-                    db.add(rating_scale)
-                    loaded_count += 1
-        
-        db.commit()
-        return {
-            "status": "success",
-            "message": f"Successfully loaded rating scales",
-            "dimension_count": len(dimensions),
-            "rating_count": loaded_count
-        }
-        
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error refreshing rating scales: {str(e)}")
+    excel_path = get_excel_path()
+    return _submit_refresh(
+        "refresh-rating-scales", excel_path, force, response, wait,
+        lambda job: _refresh_sheet(job, excel_path, RATING_SCALES_SHEET, "Error refreshing rating scales", force)
+    )
 
 @app.post("/api/mm/generate-report")
-def generate_report(db: Session = Depends(get_db)):
+def generate_report(plant: Optional[str] = None,
+                    db: Session = Depends(get_read_db_within(AREA_GRAPH_QUERIES, "POST /api/mm/generate-report"))):
     """Generate PDF report of maturity assessment"""
     try:
         from io import BytesIO
@@ -1107,7 +1738,7 @@ def generate_report(db: Session = Depends(get_db)):
         from fastapi.responses import StreamingResponse
         
         # Get all areas with dimensions
-        areas = db.query(Area).all()
+        areas = plant_areas(db, plant).all()
         
         # Create HTML report
         html_content = f"""
@@ -1207,16 +1838,48 @@ def generate_report(db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
 
-@app.get("/api/mm/rating-scales", response_model=List[RatingScaleResponse])
-def get_rating_scales(db: Session = Depends(get_db)):
-    """Get all rating scale definitions"""
-    print("DEBUG: Fetching rating scales...")  # DEBUG
-    scales = db.query(RatingScale).order_by(RatingScale.dimension_name, RatingScale.level).all()
-    print(f"DEBUG: Found {len(scales)} scales")  # DEBUG
-    return scales
+@app.get("/api/mm/rating-scales", response_model=List[RatingScaleResponse], dependencies=[conditional_on("rating_scales")])
+def get_rating_scales(request: Request, response: Response, fields: Optional[str] = None,
+                      limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None,
+                      db: Session = Depends(get_read_db)):
+    """Get all rating scale definitions
+    
+    Takes ``fields``, ``limit`` and ``after`` like /api/mm/maturity-levels.
+    """
+    names = selected_fields(fields, RATING_SCALE_FIELDS)
+    if fields is None and limit is None and after is None:
+        return cached_json(request, response, "rating_scales", lambda: reference_rows(
+            db, [getattr(RatingScale, name) for name in names], [RatingScale.dimension_name, RatingScale.level]
+        ))
+    # Ingestion keys every scale by (dimension_name, level), so neither is NULL
+    # and pages are range reads on ix_rating_scales_dimension_name_level
+    keys = [RatingScale.dimension_name, RatingScale.level, RatingScale.id]
+    return list_response(request, response, *keyset_page(db, RatingScale, names, keys, limit, after))
+
+# Serialized Matrices JSON as (version, EncodedBody); replaced when a refresh stores a new version
+_matrices_cache = (None, None)
+
+@app.get("/api/mm/matrices")
+def get_matrices(request: Request, db: Session = Depends(get_read_db)):
+    """Get the Matrices sheet: L1-L3 maturity descriptions and metric categories
+    
+    The JSON is built when the sheet is loaded. Requests only look up its
+    version and reuse the bytes held in memory until that changes.
+    """
+    global _matrices_cache
+    version = db.query(MatrixDocument.sha256).order_by(MatrixDocument.id).limit(1).scalar()
+    if version is None:
+        raise HTTPException(status_code=404, detail="Matrices not loaded; refresh the workbook data first")
+    
+    cached_version, body = _matrices_cache
+    if cached_version != version:
+        version, content = db.query(MatrixDocument.sha256, MatrixDocument.content).order_by(MatrixDocument.id).first()
+        body = EncodedBody(content.encode("utf-8"))
+        _matrices_cache = (version, body)
+    return json_response(request, body)
 
 @app.get("/api/mm/rating-scales/{dimension_name}")
-def get_rating_scale_by_dimension(dimension_name: str, db: Session = Depends(get_db)):
+def get_rating_scale_by_dimension(dimension_name: str, db: Session = Depends(get_read_db)):
     """Get rating scales for a specific dimension"""
     scales = db.query(RatingScale).filter(RatingScale.dimension_name == dimension_name).order_by(RatingScale.level).all()
     if not scales:
@@ -1232,26 +1895,31 @@ def simulate_dimension_update(dimension_id: int, db: Session = Depends(get_db)):
     
     # Simulate improvement or regression
     change = random.choice([-1, 0, 1])
-    new_level = max(1, min(5, dimension.current_level + change))
+    old_level = dimension.current_level
+    new_level = max(1, min(5, old_level + change))
     
     dimension.current_level = new_level
     dimension.updated_at = datetime.utcnow()
     
+    # A change past level 1 or 5 is clamped away and is not history
+    if new_level != old_level:
+        record_levels(db, [(dimension.id, dimension.area_id, new_level, dimension.desired_level)], SOURCE_SIMULATION)
     db.commit()
     db.refresh(dimension)
     
     return {
         "status": "updated",
         "dimension_id": dimension_id,
-        "old_level": dimension.current_level - change,
+        "old_level": old_level,
         "new_level": new_level,
         "timestamp": dimension.updated_at
     }
 
-@app.get("/api/mm/reports/summary")
-def get_reports_summary(db: Session = Depends(get_db)):
+@app.get("/api/mm/reports/summary", dependencies=[conditional_on("areas")])
+def get_reports_summary(plant: Optional[str] = None,
+                        db: Session = Depends(get_read_db_within(AREA_GRAPH_QUERIES, "GET /api/mm/reports/summary"))):
     """Get summary statistics for all areas"""
-    areas = db.query(Area).all()
+    areas = plant_areas(db, plant).all()
     summary = []
     
     for area in areas:
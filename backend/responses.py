@@ -0,0 +1,136 @@
+"""
+Fast JSON responses for the read endpoints.
+
+Bodies are encoded with orjson when it is installed (the standard json
+module otherwise) straight from plain rows, without building a Pydantic
+model per row. Reference data that changes only on refresh is kept as
+ready-to-send bytes per data version (see database.DATA_VERSION_TABLES),
+together with its gzip and, when the brotli package is installed, brotli
+variants, each compressed once on first use. The encoding is negotiated
+from Accept-Encoding on every response.
+"""
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # Optional; falls back to the standard library
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is offered without it
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+# Most bodies VersionedBodies keeps; keys include request input such as the
+# plant filter, so the least recently used are dropped past this
+MAX_CACHED_BODIES = 64
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    """JSON bytes of ``payload``; datetimes as ISO 8601, like FastAPI's encoder"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class EncodedBody:
+    """A JSON body and its compressed variants, each built on first use"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._variants = {"identity": body}
+
+    def variant(self, encoding):
+        if encoding not in self._variants:
+            self._variants[encoding] = _compress(self.body, encoding)
+        return self._variants[encoding]
+
+
+def choose_encoding(accept_encoding, size):
+    """Best encoding the client accepts for a body of ``size`` bytes"""
+    if size < MIN_COMPRESS_BYTES:
+        return "identity"
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    def acceptable(encoding):
+        return accepted.get(encoding, accepted.get("*", 0)) > 0
+
+    if brotli is not None and acceptable("br"):
+        return "br"
+    if acceptable("gzip"):
+        return "gzip"
+    return "identity"
+
+
+def json_response(request: Request, content, headers=None) -> Response:
+    """Response for a payload or EncodedBody, compressed as the client accepts"""
+    encoded = content if isinstance(content, EncodedBody) else EncodedBody(dumps(content))
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), len(encoded.body))
+    response = Response(content=encoded.variant(encoding), media_type="application/json", headers=headers)
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+class VersionedBodies:
+    """Encoded bodies keyed by name and variant, kept until their data version changes
+
+    At most ``max_entries`` bodies are held; the least recently used go first.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_BODIES):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        """Body for ``key`` at ``version``, calling ``build()`` for the payload if stale.
+
+        ``version`` must be read before ``build`` queries the tables, so a
+        body is never stored under a newer version than its data.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+        encoded = EncodedBody(dumps(build()))
+        with self._lock:
+            self._entries[key] = (version, encoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return encoded
@@ -0,0 +1,82 @@
+"""
+Precompiled reference-data snapshot for serverless cold starts.
+
+On Vercel the SQLite database lives in /tmp and starts empty on every cold
+start. Running this module loads MM_Data.xlsx into a fresh, vacuumed SQLite
+file (mm_snapshot.db), which is deployed with the function; api/index.py
+copies it into place before the first connection. The app can then serve
+areas, maturity levels and rating scales without importing pandas or
+parsing the workbook. pandas and openpyxl are only loaded if a refresh is
+requested. The snapshot carries the sheet fingerprints, so such a refresh
+skips any sheet that has not changed since the build.
+
+Usage (run from the backend directory before deploying):
+    python snapshot.py
+"""
+import os
+import shutil
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from ingestion import BACKEND_DIR, EXCEL_PATH, REFRESH_SHEETS, refresh_workbook
+
+SNAPSHOT_PATH = os.environ.get('MM_SNAPSHOT_PATH', os.path.join(BACKEND_DIR, 'mm_snapshot.db'))
+
+
+def build_snapshot(output_path=SNAPSHOT_PATH, excel_path=EXCEL_PATH):
+    """Load every refresh sheet into a new SQLite file at ``output_path``.
+
+    The file is built alongside and moved into place only once complete.
+    Returns the per-sheet load results; raises if any sheet fails.
+    """
+    partial = f"{output_path}.tmp"
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    engine = create_engine(f"sqlite:///{partial}")
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            outcomes = refresh_workbook(db, excel_path, REFRESH_SHEETS, force=True, mode="frame")
+        finally:
+            db.close()
+
+        errors = [f"{sheet}: {outcome}" for sheet, outcome in outcomes.items() if isinstance(outcome, Exception)]
+        if errors:
+            raise RuntimeError("; ".join(errors))
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+    except BaseException:
+        engine.dispose()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+    engine.dispose()
+    os.replace(partial, output_path)
+    return outcomes
+
+
+def restore_snapshot(db_path, snapshot_path=SNAPSHOT_PATH):
+    """Copy the snapshot to ``db_path`` unless a database is already there.
+
+    Returns True if the snapshot was copied.
+    """
+    if os.path.exists(db_path) or not os.path.exists(snapshot_path):
+        return False
+
+    partial = f"{db_path}.tmp"
+    shutil.copyfile(snapshot_path, partial)
+    os.replace(partial, db_path)
+    return True
+
+
+if __name__ == "__main__":
+    results = build_snapshot()
+    for sheet_name, result in results.items():
+        print(f"{sheet_name}: {result['message']}")
+    print(f"Snapshot written to {SNAPSHOT_PATH} ({os.path.getsize(SNAPSHOT_PATH) // 1024} KB)")
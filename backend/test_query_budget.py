@@ -0,0 +1,55 @@
+"""Check that the area endpoints stay within their query budgets
+
+Runs with MM_QUERY_BUDGET_STRICT=1, so an endpoint that goes over the
+budget given to get_read_db_within fails with QueryBudgetExceeded instead
+of only warning. Exits non-zero if any check fails.
+
+Usage (from the backend directory):
+    python test_query_budget.py
+"""
+import os
+import sys
+
+os.environ["MM_QUERY_BUDGET_STRICT"] = "1"
+
+from fastapi.testclient import TestClient
+
+import main
+from database import QueryBudgetExceeded, ReadSessionLocal, Area, query_budget
+
+CHECKS = [
+    ("GET", "/api/mm/areas"),
+    ("GET", "/api/mm/reports/summary"),
+    ("POST", "/api/mm/generate-report"),
+]
+
+failures = 0
+
+# Entering the client runs startup, which brings the database schema up to date
+with TestClient(main.app) as client:
+    # The guard itself must be live, or the checks below prove nothing
+    db = ReadSessionLocal()
+    try:
+        with query_budget(db, 0, "strict mode self-check"):
+            db.query(Area).first()
+        print("❌ Strict mode is off: a query over a budget of 0 was allowed")
+        failures += 1
+    except QueryBudgetExceeded:
+        print("✅ Strict mode is on")
+    finally:
+        db.close()
+    
+    for method, path in CHECKS:
+        try:
+            response = client.request(method, path)
+        except QueryBudgetExceeded as e:
+            print(f"❌ {method} {path}: {e}")
+            failures += 1
+            continue
+        if response.status_code >= 400:
+            print(f"❌ {method} {path}: status {response.status_code} {response.text[:200]}")
+            failures += 1
+        else:
+            print(f"✅ {method} {path}: within {main.AREA_GRAPH_QUERIES} queries")
+
+sys.exit(1 if failures else 0)
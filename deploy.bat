@@ -15,6 +15,18 @@ if %ERRORLEVEL% NEQ 0 (
 
 echo Vercel CLI found!
 echo.
+echo Building reference-data snapshot from MM_Data.xlsx...
+pushd backend
+python snapshot.py
+if %ERRORLEVEL% NEQ 0 (
+    popd
+    echo ERROR: Snapshot build failed
+    echo.
+    pause
+    exit /b 1
+)
+popd
+echo.
 echo Deploying to production...
 echo.
 vercel --prod
@@ -27,7 +39,8 @@ echo.
 echo Backend API: https://mahindraservicesapi.vercel.app/
 echo Frontend: https://mahindragcp.vercel.app/
 echo.
-echo NEXT STEP: Click "REFRESH SIMULATED DATA" button
-echo in the app to load all data.
+echo Reference data ships with the deployment snapshot.
+echo Click "REFRESH SIMULATED DATA" in the app only after
+echo changing MM_Data.xlsx without redeploying.
 echo.
 pause
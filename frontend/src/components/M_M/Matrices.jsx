@@ -1,5 +1,6 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { BarChart3, TrendingUp, Package, ChevronDown, ChevronUp } from 'lucide-react';
+import { apiUrl } from '../../config';
 
 const Matrices = () => {
   const [expandedCategories, setExpandedCategories] = useState({
@@ -8,6 +9,16 @@ const Matrices = () => {
     assets: true
   });
 
+  // Matrices sheet as loaded by the backend; the built-in copy below is the fallback
+  const [matrices, setMatrices] = useState(null);
+
+  useEffect(() => {
+    fetch(apiUrl('/api/mm/matrices'))
+      .then(response => (response.ok ? response.json() : null))
+      .then(data => setMatrices(data))
+      .catch(error => console.error('Error fetching matrices:', error));
+  }, []);
+
   const toggleCategory = (category) => {
     setExpandedCategories(prev => ({
       ...prev,
@@ -15,13 +26,13 @@ const Matrices = () => {
     }));
   };
 
-  const maturityLevels = {
+  const defaultMaturityLevels = {
     L1: "L1 At lower maturity- tracking is seen; data is often siloed",
     L2: "L2 At intermediate maturity, metrics become real-time, integrated across MES and ERP, and become more standardized, aligned with APQP and Best Practices.",
     L3: "L3 At advanced maturity Impact is seen on metrices (OEE uplift, energy per unit, COQ reduction, ROCE); self-optimizing KPIs are established; COQ becomes integrated in product development/manufacturing."
   };
 
-  const categories = [
+  const defaultCategories = [
     {
       id: 'operations',
       name: 'Operations & Flow',
@@ -81,6 +92,12 @@ const Matrices = () => {
     }
   ];
 
+  const maturityLevels = matrices?.maturity_levels || defaultMaturityLevels;
+  const categories = defaultCategories.map(category => {
+    const loaded = matrices?.categories?.find(c => c.name === category.name);
+    return loaded ? { ...category, metrics: loaded.metrics } : category;
+  });
+
   const colorClasses = {
     blue: {
       bg: 'bg-blue-50',
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { FileText, Download, TrendingUp, Target, CheckCircle2, AlertCircle, ChevronDown, ChevronRight, RefreshCw, Calculator, X } from 'lucide-react';
-import { apiUrl } from '../../config';
+import { apiUrl, waitForJob } from '../../config';
 
 const Reports = () => {
   const [areas, setAreas] = useState([]);
@@ -13,11 +13,56 @@ const Reports = () => {
 
   useEffect(() => {
     fetchAreas();
-    
-    // Auto-refresh every 5 seconds for streaming data demo
+
+    // Live updates: the server pushes each dimension level change as it is saved
     if (autoRefresh) {
-      const interval = setInterval(fetchAreas, 5000);
-      return () => clearInterval(interval);
+      const source = new EventSource(apiUrl('/api/mm/stream'));
+      // While the stream is down, fall back to slow polling
+      let fallback = null;
+      source.onerror = () => {
+        if (!fallback) {
+          fallback = setInterval(fetchAreas, 30000);
+        }
+      };
+      source.onopen = () => {
+        if (fallback) {
+          // Deletions are not replayed on reconnect, so reload what was missed
+          clearInterval(fallback);
+          fallback = null;
+          fetchAreas();
+        }
+      };
+      source.addEventListener('dimension', (event) => {
+        const change = JSON.parse(event.data);
+        if (change.source === 'refresh') {
+          // A sheet refresh can add or remove dimensions, so reload them all
+          fetchAreas();
+          return;
+        }
+        setAreas(current => current.map(area => area.id !== change.area_id ? area : {
+          ...area,
+          dimensions: area.dimensions.map(dim => dim.id !== change.dimension_id ? dim : {
+            ...dim,
+            current_level: change.current_level,
+            desired_level: change.desired_level
+          })
+        }));
+      });
+      source.addEventListener('deleted', (event) => {
+        const deletion = JSON.parse(event.data);
+        setAreas(current => deletion.table === 'areas'
+          ? current.filter(area => area.id !== deletion.row_id)
+          : current.map(area => area.id !== deletion.area_id ? area : {
+            ...area,
+            dimensions: area.dimensions.filter(dim => dim.id !== deletion.row_id)
+          }));
+      });
+      return () => {
+        source.close();
+        if (fallback) {
+          clearInterval(fallback);
+        }
+      };
     }
   }, [autoRefresh]);
 
@@ -65,9 +110,16 @@ const Reports = () => {
       const response = await fetch(apiUrl('/api/mm/refresh-all-data'), {
         method: 'POST',
       });
-      const result = await response.json();
+      let result = await response.json();
       
-      if (response.ok) {
+      // A 202 means the refresh runs as a background job; wait for it to
+      // finish. Otherwise (e.g. on Vercel) the server waited and sent the result.
+      if (response.status === 202) {
+        const job = await waitForJob(result.job_id);
+        result = job.status === 'succeeded' ? job.result : { message: job.error };
+      }
+      
+      if (response.ok && result.results) {
         // Reload the areas
         await fetchAreas();
         
@@ -82,6 +134,9 @@ const Reports = () => {
         if (result.results?.maturity_levels) {
           message += `📈 Maturity Levels: ${result.results.maturity_levels.count} Items\n`;
         }
+        if (result.results?.matrices) {
+          message += `📐 Matrices: ${result.results.matrices.category_count} Categories, ${result.results.matrices.metric_count} Metrics\n`;
+        }
         
         alert(message);
       } else {
@@ -1,6 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { CheckSquare, Square, ChevronDown, ChevronRight, Save, RefreshCw } from 'lucide-react';
-import { apiUrl } from '../../config';
+import { apiUrl, waitForJob } from '../../config';
 
 const SmartFactoryChecksheet = () => {
   const [maturityLevels, setMaturityLevels] = useState([]);
@@ -17,6 +17,8 @@ const SmartFactoryChecksheet = () => {
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
   const [assessmentId, setAssessmentId] = useState(null);
+  // Assessment version the checksheet reflects; sent with each change
+  const assessmentVersion = useRef(0);
   const [saving, setSaving] = useState(false);
 
   const initializeAssessment = async () => {
@@ -35,6 +37,7 @@ const SmartFactoryChecksheet = () => {
       if (response.ok) {
         const assessment = await response.json();
         setAssessmentId(assessment.id);
+        assessmentVersion.current = assessment.version;
         
         // Load existing selections if any
         const selectionsResponse = await fetch(apiUrl(`/api/mm/checksheet-selections/${assessment.id}`));
@@ -96,9 +99,18 @@ const SmartFactoryChecksheet = () => {
       const response = await fetch(apiUrl('/api/mm/refresh-simulated-data'), {
         method: 'POST',
       });
-      const result = await response.json();
+      let result = await response.json();
       
-      if (response.ok) {
+      // A 202 means the refresh runs as a background job; wait for it to
+      // finish. Otherwise (e.g. on Vercel) the server waited and sent the result.
+      let succeeded = response.ok;
+      if (response.status === 202) {
+        const job = await waitForJob(result.job_id);
+        succeeded = job.status === 'succeeded';
+        result = succeeded ? job.result : { detail: job.error };
+      }
+      
+      if (succeeded) {
         // Reload the maturity levels
         await fetchMaturityLevels();
         alert(`✅ ${result.message}\n\nLoaded ${result.count} items from Excel`);
@@ -128,19 +140,37 @@ const SmartFactoryChecksheet = () => {
       [id]: newValue
     }));
 
-    // Save selection to backend immediately
+    // Save only this change; if another assessor saved first, merge their
+    // changes and send it again on top of the new version
     if (assessmentId) {
       try {
-        await fetch(apiUrl('/api/mm/checksheet-selections'), {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify([{
-            assessment_id: assessmentId,
-            maturity_level_id: id,
-            is_selected: newValue,
-            evidence: null
-          }])
-        });
+        for (let attempt = 0; attempt < 3; attempt++) {
+          const response = await fetch(apiUrl(`/api/mm/assessments/${assessmentId}/selections`), {
+            method: 'PATCH',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+              version: assessmentVersion.current,
+              changes: [{ maturity_level_id: id, is_selected: newValue, evidence: null }]
+            })
+          });
+          const result = await response.json();
+          if (response.status !== 409) {
+            if (response.ok) {
+              assessmentVersion.current = result.version;
+            }
+            break;
+          }
+          const { version, changes } = result.detail;
+          assessmentVersion.current = version;
+          setSelectedItems(prev => {
+            const merged = { ...prev };
+            changes.forEach(sel => {
+              merged[sel.maturity_level_id] = sel.is_selected;
+            });
+            merged[id] = newValue;
+            return merged;
+          });
+        }
       } catch (error) {
         console.error('Error saving selection:', error);
       }
@@ -13,6 +13,21 @@ export const API_BASE_URL = isDevelopment
 // Helper function for making API calls
 export const apiUrl = (path) => `${API_BASE_URL}${path}`;
 
+// Refresh endpoints run as background jobs; poll until the job finishes
+export const waitForJob = async (jobId, intervalMs = 1000) => {
+  while (true) {
+    const response = await fetch(apiUrl(`/api/mm/jobs/${jobId}`));
+    const job = await response.json();
+    if (!response.ok) {
+      throw new Error(job.detail || 'Failed to fetch job status');
+    }
+    if (job.status === 'succeeded' || job.status === 'failed') {
+      return job;
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+};
+
 // Debug: Log the API URL being used (will show in browser console)
 console.log('🔧 API Configuration Loaded');
 console.log('🎯 Mode:', process.env.NODE_ENV || 'production');